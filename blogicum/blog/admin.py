@@ -40,14 +40,22 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_editable = ("is_published",)
     list_filter = ("category", "location", "is_published")
-    search_fields = ("title", "author__username")
+    search_fields = ("title", "text", "author__username")
     ordering = ("-pub_date",)
     list_select_related = ("author", "category", "location")
+    readonly_fields = ("comment_count",)
 
-    @admin.display(description="Комментарии")
-    def comment_count(self, obj):
-        """Подсчёт числа комментариев для поста."""
-        return obj.comments.count()
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по заголовку и тексту через FTS5-индекс вместо LIKE '%x%'
+        и точное совпадение имени автора (по уникальному индексу).
+        """
+        if not search_term.strip():
+            return queryset, False
+        return (
+            queryset.matching(search_term)
+            | queryset.filter(author__username=search_term.strip())
+        ), False
 
 
 @admin.register(Comment)
@@ -0,0 +1,334 @@
+"""
+Кэш страниц для анонимных посетителей и карточек постов.
+
+Каждая запись помнит версии «тегов» (post:1, category:2, feed:index...),
+от которых зависит страница или карточка. Сигналы моделей меняют версии тегов,
+и запись перестаёт считаться свежей — без перебора ключей кэша.
+
+Устаревшая запись страницы ещё BLOG_PAGE_CACHE_STALE_TIMEOUT секунд
+хранится в кэше: горячие ленты отдают её, пока один воркер, взявший
+page_locks по ключу страницы, собирает новую (stale-while-revalidate).
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.locks import KeyLock
+
+PAGE_KEY_PREFIX = "blog:page:"
+COUNT_KEY_PREFIX = "blog:count:"
+VALIDATORS_KEY_PREFIX = "blog:validators:"
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+TAG_KEY_PREFIX = "blog:tag:"
+UNCACHEABLE_KEY_PREFIX = "blog:uncacheable:"
+
+# Общий тег всех лент: меняется при массовом пересчёте видимости.
+FEEDS_TAG = "feeds"
+
+
+class CacheStats:
+    """Потокобезопасные счётчики попаданий и промахов."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stale_hit(self):
+        """Отдана устаревшая запись, пока другой воркер собирает новую."""
+        with self._lock:
+            self.stale += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits, misses, stale = self.hits, self.misses, self.stale
+        total = hits + misses + stale
+        return {
+            "hits": hits,
+            "misses": misses,
+            "stale": stale,
+            "ratio": (hits + stale) / total if total else 0.0,
+        }
+
+
+page_cache_stats = CacheStats()
+fragment_cache_stats = CacheStats()
+count_cache_stats = CacheStats()
+
+
+page_locks = KeyLock(getattr(settings, "BLOG_PAGE_CACHE_LOCK_DIR", None))
+
+
+@receiver(setting_changed)
+def reset_page_locks(setting, **kwargs):
+    """Каталог блокировок следует за override_settings (bench_wsgi)."""
+    global page_locks
+    if setting == "BLOG_PAGE_CACHE_LOCK_DIR":
+        page_locks = KeyLock(getattr(
+            settings, "BLOG_PAGE_CACHE_LOCK_DIR", None))
+
+
+def get_cache():
+    return caches[getattr(settings, "BLOG_PAGE_CACHE_ALIAS", "default")]
+
+
+def get_tag_versions(tags) -> dict:
+    """
+    Текущие версии тегов. Отсутствующая (ещё не созданная или вытесненная
+    из кэша) версия заводится заново, поэтому записи, собранные при
+    старой версии, свежими уже не считаются.
+    """
+    tags = list(tags)
+    stored = get_cache().get_many([TAG_KEY_PREFIX + tag for tag in tags])
+    versions = {tag: stored.get(TAG_KEY_PREFIX + tag) for tag in tags}
+    missing = {tag: uuid.uuid4().hex
+               for tag, version in versions.items() if version is None}
+    if missing:
+        get_cache().set_many(
+            {TAG_KEY_PREFIX + tag: version
+             for tag, version in missing.items()},
+            timeout=None,
+        )
+        versions.update(missing)
+    return versions
+
+
+# Сколько раз этот процесс менял версии тегов: по этому числу
+# локальные кэши (blog.lookups) сразу замечают свои же изменения.
+local_bumps = 0
+
+
+def bump_tags(*tags):
+    """Новая версия у тегов делает несвежими все зависящие от них записи."""
+    global local_bumps
+    tags = [tag for tag in tags if tag]
+    if tags:
+        get_cache().set_many(
+            {TAG_KEY_PREFIX + tag: uuid.uuid4().hex for tag in tags},
+            timeout=None,
+        )
+        local_bumps += 1
+
+
+def post_tags(post) -> list:
+    """Теги, от которых зависит отображение поста в карточке и на странице."""
+    tags = [f"post:{post.pk}", f"user:{post.author_id}"]
+    if post.category_id:
+        tags.append(f"category:{post.category_id}")
+    if post.location_id:
+        tags.append(f"location:{post.location_id}")
+    return tags
+
+
+def feed_tags(post) -> list:
+    """Теги лент, в которые может попасть пост."""
+    tags = ["feed:index", f"feed:author:{post.author_id}"]
+    if post.category_id:
+        tags.append(f"feed:category:{post.category_id}")
+    return tags
+
+
+def post_card_version(post, tag_versions=None) -> str:
+    """
+    Версия карточки поста: меняется вместе с постом, его категорией,
+    локацией, автором и числом комментариев.
+    """
+    tags = post_tags(post)
+    if tag_versions is None:
+        tag_versions = get_tag_versions(tags)
+    parts = [tag_versions[tag] for tag in tags]
+    parts.append(str(post.comment_count))
+    return hashlib.md5(
+        ":".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def attach_card_versions(posts):
+    """Версии карточек для целой страницы ленты одним запросом к кэшу."""
+    posts = list(posts)
+    tag_versions = get_tag_versions(
+        {tag for post in posts for tag in post_tags(post)})
+    for post in posts:
+        post.card_version = post_card_version(post, tag_versions)
+
+
+def post_card_key(post) -> str:
+    version = getattr(post, "card_version", None) or post_card_version(post)
+    return f"blog:card:{post.pk}:{version}"
+
+
+def get_fragment_timeout() -> int:
+    return getattr(settings, "BLOG_FRAGMENT_CACHE_TIMEOUT", 0)
+
+
+def get_count_timeout() -> int:
+    return getattr(settings, "BLOG_COUNT_CACHE_TIMEOUT", 0)
+
+
+def get_count_estimate_threshold():
+    return getattr(settings, "BLOG_COUNT_ESTIMATE_THRESHOLD", None)
+
+
+def get_count_estimate_ttl() -> int:
+    return getattr(settings, "BLOG_COUNT_ESTIMATE_TTL", 0)
+
+
+def is_cacheable_request(request) -> bool:
+    return (
+        get_page_timeout() > 0
+        and request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+    )
+
+
+def get_page_timeout() -> int:
+    return getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", 0)
+
+
+def page_key(request) -> str:
+    url = request.build_absolute_uri()
+    return PAGE_KEY_PREFIX + hashlib.md5(
+        url.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_validators_timeout() -> int:
+    return getattr(settings, "BLOG_VALIDATORS_CACHE_TIMEOUT", 0)
+
+
+def validators_key(request) -> str:
+    url = request.build_absolute_uri()
+    return VALIDATORS_KEY_PREFIX + hashlib.md5(
+        f"{url}:{request.user.pk}".encode(),
+        usedforsecurity=False).hexdigest()
+
+
+def get_validators(key):
+    """
+    Сохранённые при последнем ответе 200 версии тегов страницы и дата
+    её изменения либо None, если записи нет или теги с тех пор менялись.
+    """
+    entry = get_cache().get(key)
+    if entry is None or get_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    return entry
+
+
+def store_validators(key, tags, last_modified=None, csrf=False) -> dict:
+    """Запись валидаторов; csrf — в страницу выдан CSRF-токен."""
+    entry = {
+        "tags": get_tag_versions({FEEDS_TAG, *tags}),
+        "last_modified": last_modified,
+        "csrf": csrf,
+    }
+    get_cache().set(key, entry, timeout=get_validators_timeout())
+    return entry
+
+
+def get_page_stale_timeout() -> int:
+    return getattr(settings, "BLOG_PAGE_CACHE_STALE_TIMEOUT", 0)
+
+
+def get_page_lock_timeout():
+    return getattr(settings, "BLOG_PAGE_CACHE_LOCK_TIMEOUT", None)
+
+
+def get_uncacheable_timeout() -> int:
+    return getattr(settings, "BLOG_PAGE_CACHE_UNCACHEABLE_TIMEOUT", 0)
+
+
+def remember_uncacheable(key):
+    """
+    Пометка, что по ключу страницы собирается ответ, который не кэшируется
+    (404, неизвестная ?page=): такие запросы не ждут page_locks.
+    """
+    timeout = get_uncacheable_timeout()
+    if timeout > 0:
+        get_cache().set(UNCACHEABLE_KEY_PREFIX + key, True, timeout=timeout)
+
+
+def is_uncacheable(key) -> bool:
+    return get_cache().get(UNCACHEABLE_KEY_PREFIX + key) is not None
+
+
+def get_page_entry(key):
+    """Запись страницы и признак её свежести; (None, False) — записи нет."""
+    entry = get_cache().get(key)
+    if entry is None:
+        return None, False
+    fresh = (
+        entry["fresh_until"] > time.time()
+        and get_tag_versions(entry["tags"]) == entry["tags"]
+    )
+    return entry, fresh
+
+
+def get_page(key, request):
+    """
+    Готовый ответ из кэша (или 304 по сохранённым ETag/Last-Modified)
+    либо None, если записи нет или она устарела.
+    """
+    entry, fresh = get_page_entry(key)
+    if not fresh:
+        page_cache_stats.miss()
+        return None
+    page_cache_stats.hit()
+    return page_response(entry, request)
+
+
+def page_response(entry, request):
+    response = HttpResponse(
+        entry["content"],
+        content_type=entry["content_type"],
+        status=entry["status"],
+        headers=entry["headers"],
+    )
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=parse_http_date_safe(response.get("Last-Modified")),
+        response=response,
+    )
+
+
+def store_page(key, request, response, tags):
+    """
+    Сохранение отрендеренного ответа. Ответы, которые выдали посетителю
+    CSRF-токен или ставят cookie, персональны и в кэш не попадают.
+    """
+    if (
+        response.status_code != 200
+        or response.cookies
+        or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    ):
+        return
+    get_cache().set(
+        key,
+        {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "status": response.status_code,
+            "headers": {header: response[header]
+                        for header in VALIDATOR_HEADERS
+                        if response.has_header(header)},
+            "tags": get_tag_versions({FEEDS_TAG, *tags}),
+            "fresh_until": time.time() + get_page_timeout(),
+        },
+        timeout=get_page_timeout() + get_page_stale_timeout(),
+    )
@@ -0,0 +1,80 @@
+"""
+Потоковая выгрузка постов и комментариев в NDJSON и CSV.
+
+Строки читаются из базы порциями (.iterator(chunk_size=...)) как
+кортежи values_list и сразу превращаются в текст, поэтому память
+не зависит от объёма выгрузки.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+EXPORTS = {
+    "posts": (Post, (
+        "id", "title", "text", "pub_date", "created_at", "updated_at",
+        "is_published", "author__username", "category__slug",
+        "location__name", "image", "comment_count",
+    )),
+    "comments": (Comment, (
+        "id", "post_id", "text", "created_at", "is_published",
+        "author__username",
+    )),
+}
+# Фильтры по автору и категории для каждого вида выгрузки.
+FILTERS = {
+    "posts": {"author": "author__username", "category": "category__slug"},
+    "comments": {"author": "author__username",
+                 "category": "post__category__slug"},
+}
+FORMATS = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_rows(kind, author=None, category=None,
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """Поля и итератор по строкам-кортежам в порядке первичного ключа."""
+    model, fields = EXPORTS[kind]
+    lookups = {
+        FILTERS[kind][name]: value
+        for name, value in (("author", author), ("category", category))
+        if value
+    }
+    rows = (model.objects.filter(**lookups).order_by("pk")
+            .values_list(*fields).iterator(chunk_size=chunk_size))
+    return fields, rows
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: write() возвращает строку, а не пишет."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in row
+        )
+
+
+def render(kind, fmt, author=None, category=None,
+           chunk_size=DEFAULT_CHUNK_SIZE):
+    """Итератор строк выгрузки kind ('posts'/'comments') в формате fmt."""
+    fields, rows = export_rows(kind, author, category, chunk_size)
+    lines = ndjson_lines if fmt == "ndjson" else csv_lines
+    return lines(fields, rows)
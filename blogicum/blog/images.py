@@ -0,0 +1,83 @@
+"""
+Уменьшенные копии изображений постов для лент и страниц.
+
+Из загруженного файла строятся JPEG- и WebP-варианты нескольких
+ширин; их имена и размеры хранятся в Post.image_variants.
+"""
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 960)
+VARIANT_FORMATS = {
+    "jpeg": {"ext": "jpg", "params": {"quality": 82, "optimize": True,
+                                      "progressive": True}},
+    "webp": {"ext": "webp", "params": {"quality": 80, "method": 4}},
+}
+VARIANTS_DIR = "post_images/variants"
+
+
+def build_variants(image_file) -> dict:
+    """
+    Строит варианты изображения и возвращает описание для
+    Post.image_variants. Варианты шире оригинала не создаются.
+    """
+    image_file.open("rb")
+    try:
+        with Image.open(image_file) as source:
+            source = ImageOps.exif_transpose(source).convert("RGB")
+    finally:
+        image_file.close()
+    width, height = source.size
+    widths = sorted({min(w, width) for w in VARIANT_WIDTHS})
+    stem = posixpath.splitext(posixpath.basename(image_file.name))[0]
+    variants = []
+    for variant_width in widths:
+        variant_height = max(1, round(height * variant_width / width))
+        resized = (source if variant_width == width
+                   else source.resize((variant_width, variant_height),
+                                      Image.Resampling.LANCZOS))
+        for fmt, options in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=fmt.upper(), **options["params"])
+            name = default_storage.save(
+                f"{VARIANTS_DIR}/{stem}_{variant_width}.{options['ext']}",
+                ContentFile(buffer.getvalue()),
+            )
+            variants.append({
+                "name": name,
+                "format": fmt,
+                "width": variant_width,
+                "height": variant_height,
+            })
+    return {
+        "source": image_file.name,
+        "width": width,
+        "height": height,
+        "variants": variants,
+    }
+
+
+def delete_variants(image_variants):
+    for variant in (image_variants or {}).get("variants", ()):
+        default_storage.delete(variant["name"])
+
+
+def srcset(image_variants, fmt) -> str:
+    return ", ".join(
+        f"{default_storage.url(variant['name'])} {variant['width']}w"
+        for variant in image_variants.get("variants", ())
+        if variant["format"] == fmt
+    )
+
+
+def largest_variant_url(image_variants, fmt):
+    variants = [variant for variant in image_variants.get("variants", ())
+                if variant["format"] == fmt]
+    if not variants:
+        return None
+    largest = max(variants, key=lambda variant: variant["width"])
+    return default_storage.url(largest["name"])
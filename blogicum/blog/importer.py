@@ -0,0 +1,317 @@
+"""
+Загрузка фикстур формата dumpdata (JSON-массив, как db.json, или
+JSONL/NDJSON по объекту в строке) за постоянную память.
+
+В отличие от loaddata файл разбирается потоково, объекты копятся
+в пачки по модели и вставляются bulk_create — по транзакции на пачку.
+Внешние ключи каждой пачки проверяются одним запросом на связанную
+модель. Для ссылок вперёд (dumpdata выгружает blog раньше auth)
+запоминаются только сами значения ключей: они снимаются, как только
+пачка связанной модели вставлена, а оставшиеся в конце загрузки
+проверяются ещё раз. Сигналы не отправляются,
+поэтому анонс и HTML текста считаются перед вставкой, а остальные
+денормализованные поля постов пересчитываются в конце.
+"""
+import json
+import time
+from collections import defaultdict
+
+from django.core.serializers.python import Deserializer
+from django.db import IntegrityError, connection, transaction
+
+from . import cache, search
+from .models import Category, Comment, Post
+
+READ_SIZE = 64 * 1024
+CONFLICT_MODES = ("error", "ignore", "update")
+
+
+class FixtureError(Exception):
+    """Ошибка данных фикстуры (битый JSON, висячий внешний ключ)."""
+
+
+def iter_objects(stream, read_size=READ_SIZE):
+    """Объекты фикстуры по одному: из JSON-массива или из NDJSON."""
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    if not first:
+        return
+    if first != "[":
+        yield from _iter_lines(first + stream.readline(), stream)
+    else:
+        yield from _iter_array(stream, read_size)
+
+
+def _iter_array(stream, read_size):
+    """Элементы JSON-массива, открывающая скобка которого уже прочитана."""
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = stream.read(read_size), 0
+            if not buffer:
+                raise FixtureError("Файл оборвался внутри JSON-массива.")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = stream.read(max(read_size, len(buffer) - pos))
+            if not chunk:
+                raise FixtureError(
+                    f"Некорректный JSON около: {buffer[pos:pos + 80]!r}")
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield obj
+        pos = end
+        if pos > read_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def _iter_lines(first_line, stream):
+    for number, line in enumerate(_chain_line(first_line, stream), 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise FixtureError(f"Строка {number}: {error}")
+
+
+def _chain_line(first_line, stream):
+    yield first_line
+    yield from stream
+
+
+class SQLiteIndexes:
+    """
+    Снятие вторичных индексов и триггеров таблицы на время загрузки
+    и их восстановление из сохранённого в sqlite_master SQL.
+    Уникальные индексы остаются: они нужны для проверки данных.
+    """
+
+    def __init__(self):
+        self.saved = []
+        self.tables = set()
+
+    def drop(self, table):
+        if table in self.tables:
+            return
+        self.tables.add(table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name, sql FROM sqlite_master"
+                " WHERE tbl_name = %s AND type IN ('index', 'trigger')"
+                " AND sql IS NOT NULL", [table])
+            for kind, name, sql in cursor.fetchall():
+                if sql.upper().startswith("CREATE UNIQUE"):
+                    continue
+                cursor.execute(
+                    f'DROP {kind.upper()} {connection.ops.quote_name(name)}')
+                self.saved.append(sql)
+
+    def restore(self):
+        with connection.cursor() as cursor:
+            for sql in self.saved:
+                cursor.execute(sql)
+        if "blog_post" in self.tables:
+            # Триггеры поиска снимались — индекс FTS строится заново.
+            search.rebuild_index()
+        self.saved, self.tables = [], set()
+
+
+class FixtureImporter:
+    """Пакетная загрузка десериализованных объектов фикстуры."""
+
+    def __init__(self, batch_size=2000, on_conflict="error",
+                 exclude=(), skip_missing=False, drop_indexes=False,
+                 progress=None):
+        self.batch_size = batch_size
+        self.on_conflict = on_conflict
+        self.exclude = {label.lower() for label in exclude}
+        self.skip_missing = skip_missing
+        self.indexes = SQLiteIndexes() if drop_indexes else None
+        self.progress = progress or (lambda label, count, elapsed: None)
+        self.counts = defaultdict(int)
+        self.skipped = defaultdict(int)
+        # (модель, поле) -> значения ключа, ещё не найденные в базе.
+        self.pending = defaultdict(set)
+        self.started = None
+
+    def load(self, stream):
+        self.started = time.monotonic()
+        batch, model = [], None
+        try:
+            # Ссылки вперёд нарушают внешние ключи до конца загрузки:
+            # их проверяет _resolve_pending(), а не SQLite при COMMIT.
+            with connection.constraint_checks_disabled():
+                objects = Deserializer(
+                    self._filtered(iter_objects(stream)),
+                    ignorenonexistent=True,
+                )
+                try:
+                    for deserialized in objects:
+                        if type(deserialized.object) is not model or len(
+                                batch) >= self.batch_size:
+                            self._flush(model, batch)
+                            batch, model = [], type(deserialized.object)
+                        batch.append(deserialized)
+                    self._flush(model, batch)
+                except IntegrityError as error:
+                    # Прежние пачки уже в базе; висячие ссылки в них
+                    # убираем, чтобы не оставить нарушенных ключей.
+                    self._resolve_pending()
+                    raise FixtureError(
+                        f"Пачка {model._meta.label} не загружена: {error}. "
+                        f"Уже сохранено: {self._committed()}. "
+                        "Повторите с --on-conflict=ignore или update."
+                    ) from error
+                errors = self._resolve_pending()
+                if errors and not self.skip_missing:
+                    raise FixtureError("; ".join(errors))
+        finally:
+            if self.indexes:
+                self.indexes.restore()
+        self.finish()
+        return dict(self.counts)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def _committed(self):
+        return ", ".join(f"{label}: {count}"
+                         for label, count in self.counts.items()
+                         if count) or "ничего"
+
+    def _filtered(self, objects):
+        for obj in objects:
+            label = obj.get("model", "").lower()
+            if label in self.exclude or label.split(".")[0] in self.exclude:
+                continue
+            yield obj
+
+    def _flush(self, model, batch):
+        if not batch:
+            return
+        if self.indexes:
+            self.indexes.drop(model._meta.db_table)
+        self._check_foreign_keys(model, batch)
+        objs = [deserialized.object for deserialized in batch]
+        if model is Post:
+            for obj in objs:
+                obj.refresh_rendered_text()
+        with transaction.atomic():
+            model._base_manager.bulk_create(objs, **self._conflict_options(
+                model))
+            self._insert_m2m(model, batch)
+        if model is Post and self.on_conflict == "update":
+            cache.bump_tags(*(f"post:{obj.pk}" for obj in objs))
+        self._resolve_forward(model, {obj.pk for obj in objs})
+        label = model._meta.label
+        self.counts[label] += len(objs)
+        self.progress(label, self.counts[label], self.elapsed)
+
+    def _conflict_options(self, model):
+        if self.on_conflict == "ignore":
+            return {"ignore_conflicts": True}
+        if self.on_conflict == "update":
+            pk = model._meta.pk
+            return {
+                "update_conflicts": True,
+                "unique_fields": [pk.name],
+                "update_fields": [
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key
+                ],
+            }
+        return {}
+
+    def _check_foreign_keys(self, model, batch):
+        """
+        Одним запросом на связанную модель ищет ссылки на ещё
+        не загруженные строки и запоминает их значения.
+        """
+        batch_pks = {deserialized.object.pk for deserialized in batch}
+        for field in model._meta.concrete_fields:
+            if not field.many_to_one:
+                continue
+            values = {getattr(deserialized.object, field.attname)
+                      for deserialized in batch} - {None}
+            if field.related_model is model:
+                values -= batch_pks
+            values -= self.pending[model, field]
+            missing = values - self._existing(field.related_model, values)
+            if missing:
+                self.pending[model, field] |= missing
+
+    def _resolve_forward(self, related_model, pks):
+        """Вставленная пачка снимает отложенные ссылки на свои строки."""
+        for (model, field), values in self.pending.items():
+            if field.related_model is related_model:
+                values -= pks
+
+    @staticmethod
+    def _existing(model, values):
+        if not values:
+            return set()
+        return set(model._base_manager.filter(
+            pk__in=values).values_list("pk", flat=True))
+
+    def _resolve_pending(self):
+        """
+        Повторная проверка отложенных ссылок. Строки с висячими ссылками
+        не остаются в базе ни в каком режиме; возвращает описания ошибок.
+        """
+        errors = []
+        for (model, field), pending in self.pending.items():
+            values = list(pending)
+            missing = set()
+            for start in range(0, len(values), self.batch_size):
+                chunk = set(values[start:start + self.batch_size])
+                missing |= chunk - self._existing(field.related_model, chunk)
+            if not missing:
+                continue
+            label = model._meta.label
+            missing = sorted(missing)
+            deleted = 0
+            for start in range(0, len(missing), self.batch_size):
+                _, per_model = model._base_manager.filter(**{
+                    f"{field.attname}__in": missing[
+                        start:start + self.batch_size]}).delete()
+                deleted += per_model.get(label, 0)
+            self.skipped[label] += deleted
+            self.counts[label] -= deleted
+            errors.append(f"{label}: ссылки на несуществующие объекты: "
+                          + ", ".join(f"{field.name}={value}"
+                                      for value in missing[:5]))
+        self.pending.clear()
+        return errors
+
+    def _insert_m2m(self, model, batch):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_field_name() + "_id"
+            target = field.m2m_reverse_field_name() + "_id"
+            rows = [
+                through(**{source: deserialized.object.pk, target: pk})
+                for deserialized in batch
+                for pk in (deserialized.m2m_data or {}).get(field.name, ())
+            ]
+            if rows:
+                through._base_manager.bulk_create(rows,
+                                                  ignore_conflicts=True)
+
+    def finish(self):
+        """Пересчёт того, что при обычном save() делают модель и сигналы."""
+        labels = set(self.counts)
+        touched = {Post._meta.label, Comment._meta.label,
+                   Category._meta.label}
+        if not labels & touched:
+            return
+        Post.objects.refresh_visibility()
+        Post.objects.rebuild_comment_counts()
+        cache.bump_tags(cache.FEEDS_TAG)
@@ -0,0 +1,187 @@
+"""
+Двухуровневый кэш часто запрашиваемых объектов: категории по slug,
+пользователи по username, посты по id.
+
+Первый уровень — ограниченный LRU в памяти процесса с временем жизни
+записей: попадание не требует ни сериализации, ни обращения к бэкенду.
+Второй — настроенный кэш Django (BLOG_PAGE_CACHE_ALIAS), общий для
+процессов. Каждая запись привязана к версиям тегов своего объекта
+(category:<id>, user:<id>, post:<id> и связи поста, см. blog.cache):
+сигналы моделей меняют их, и устаревает только этот объект, а не все
+записи вида. Изменения из этого процесса видны сразу, из других —
+не позже BLOG_LOOKUP_VERSION_CHECK секунд.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import Http404
+
+from . import cache
+from .models import Category, Post, User
+
+LOOKUP_KEY_PREFIX = "blog:lookup:"
+
+local_stats = cache.CacheStats()
+shared_stats = cache.CacheStats()
+
+
+def get_local_size() -> int:
+    return getattr(settings, "BLOG_LOOKUP_LOCAL_SIZE", 0)
+
+
+def get_local_timeout() -> float:
+    return getattr(settings, "BLOG_LOOKUP_LOCAL_TIMEOUT", 0)
+
+
+def get_shared_timeout() -> int:
+    return getattr(settings, "BLOG_LOOKUP_CACHE_TIMEOUT", 0)
+
+
+def get_version_check() -> float:
+    return getattr(settings, "BLOG_LOOKUP_VERSION_CHECK", 0)
+
+
+class TwoTierCache:
+    """
+    LRU процесса перед общим кэшем для одного вида объектов.
+    tags_of(obj) — теги, от которых зависит объект; запись помнит их
+    версии и перестаёт находиться, когда любая из них сменится.
+    LRU хранит объект сериализованным: pickle.loads на попадании в разы
+    дешевле copy.deepcopy и так же отдаёт вьюхе независимую копию вместе
+    со связанными объектами (post.author, post.category).
+    """
+
+    def __init__(self, namespace, tags_of):
+        self.namespace = namespace
+        self.tags_of = tags_of
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, load):
+        """Объект по ключу; load() достаёт его из базы (None — нет)."""
+        if get_shared_timeout() <= 0:
+            return load()
+        data = self._get_local(key)
+        if data is not None:
+            local_stats.hit()
+            return pickle.loads(data)
+        local_stats.miss()
+        shared_key = f"{LOOKUP_KEY_PREFIX}{self.namespace}:{key}"
+        entry = cache.get_cache().get(shared_key)
+        if (entry is not None
+                and cache.get_tag_versions(entry["tags"]) == entry["tags"]):
+            shared_stats.hit()
+            value, versions = entry["value"], entry["tags"]
+        else:
+            shared_stats.miss()
+            value = load()
+            if value is None:
+                return None
+            versions = cache.get_tag_versions(self.tags_of(value))
+            cache.get_cache().set(shared_key,
+                                  {"value": value, "tags": versions},
+                                  timeout=get_shared_timeout())
+        # LRU получает байты, так что value остаётся в распоряжении вызова.
+        self._set_local(key, versions, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key):
+        """
+        Запись процесса. Версии её тегов сверяются с общим кэшем не чаще
+        раза в BLOG_LOOKUP_VERSION_CHECK секунд либо сразу после смены
+        версий тегов в этом процессе.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            if (entry["seen_bumps"] == cache.local_bumps
+                    and now - entry["checked_at"] < get_version_check()):
+                return entry["value"]
+        seen_bumps = cache.local_bumps
+        if cache.get_tag_versions(entry["tags"]) != entry["tags"]:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+        entry.update(checked_at=now, seen_bumps=seen_bumps)
+        return entry["value"]
+
+    def _set_local(self, key, versions, value):
+        size = get_local_size()
+        if size <= 0:
+            return
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = {
+                "value": data,
+                "tags": versions,
+                "expires_at": now + get_local_timeout(),
+                "checked_at": now,
+                "seen_bumps": cache.local_bumps,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+
+categories = TwoTierCache(
+    "category", lambda category: [f"category:{category.pk}"])
+users = TwoTierCache("user", lambda user: [f"user:{user.pk}"])
+# Видимость постов массово пересчитывается со сменой общего тега лент.
+posts = TwoTierCache(
+    "post", lambda post: [*cache.post_tags(post), cache.FEEDS_TAG])
+
+
+def get_published_category(slug):
+    category = categories.get(
+        slug,
+        lambda: Category.objects.filter(slug=slug, is_published=True).first(),
+    )
+    if category is None:
+        raise Http404("Категория не найдена.")
+    return category
+
+
+def get_user(username):
+    # Хеш пароля в общий кэш не попадает.
+    user = users.get(
+        username,
+        lambda: User.objects.defer("password").filter(
+            username=username).first(),
+    )
+    if user is None:
+        raise Http404("Пользователь не найден.")
+    return user
+
+
+def get_post(pk):
+    """Пост со связями для страницы поста (без проверки видимости)."""
+    post = posts.get(
+        str(pk),
+        lambda: Post.objects.select_related(
+            "location", "category", "author")
+        .defer("author__password").filter(pk=pk).first(),
+    )
+    if post is None:
+        raise Http404("Публикация не найдена.")
+    return post
+
+
+def clear_local():
+    """Сброс уровня процесса — например, после очистки общего кэша."""
+    for tier in (categories, users, posts):
+        tier.clear()
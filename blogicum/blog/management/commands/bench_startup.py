@@ -0,0 +1,144 @@
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Профиль: модуль настроек и нужен ли ему collectstatic (манифест статики).
+PROFILES = {
+    "development": ("blogicum.settings", False),
+    "production": ("blogicum.settings_production", True),
+}
+
+# Замер внутри свежего интерпретатора: импорт blogicum.wsgi (setup Django,
+# приложения, middleware) и два запроса — первый компилирует шаблоны.
+CHILD_SCRIPT = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from blogicum.wsgi import application
+booted = time.perf_counter()
+
+
+def request(path):
+    environ = {"PATH_INFO": path, "REMOTE_ADDR": "127.0.0.1",
+               "SERVER_NAME": "127.0.0.1", "HTTP_HOST": "127.0.0.1"}
+    setup_testing_defaults(environ)
+    status = []
+    began = time.perf_counter()
+    result = application(
+        environ, lambda line, headers, exc=None: status.append(line))
+    b"".join(result)
+    result.close()
+    return int(status[0].split()[0]), time.perf_counter() - began
+
+
+first_status, first = request(sys.argv[1])
+second_status, second = request(sys.argv[1])
+json.dump({
+    "import_ms": (booted - started) * 1000,
+    "first_request_ms": first * 1000,
+    "second_request_ms": second * 1000,
+    "status": max(first_status, second_status),
+    "modules": len(sys.modules),
+}, sys.stdout)
+"""
+METRICS = ("wall_ms", "import_ms", "first_request_ms", "second_request_ms")
+
+
+class Command(BaseCommand):
+    help = (
+        "Время запуска воркера по профилям настроек: импорт blogicum.wsgi "
+        "и первые запросы в свежем интерпретаторе, медиана по повторам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", action="append", choices=PROFILES, dest="profiles",
+            help="Профиль для замера (можно несколько; по умолчанию все).")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Сколько раз запускать каждый профиль.")
+        parser.add_argument("--path", default="/pages/about/",
+                            help="URL первых запросов.")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"] or list(PROFILES)
+        repeat = max(1, options["repeat"])
+        with tempfile.TemporaryDirectory(prefix="blogicum-startup-") as tmp:
+            env = self.environment(tmp)
+            results = {}
+            for profile in profiles:
+                module, collect = PROFILES[profile]
+                profile_env = {**env, "DJANGO_SETTINGS_MODULE": module}
+                if collect:
+                    self.collectstatic(profile_env)
+                runs = [self.measure(profile_env, options["path"])
+                        for _ in range(repeat)]
+                results[profile] = {
+                    **{metric: statistics.median(run[metric] for run in runs)
+                       for metric in METRICS},
+                    "modules": runs[-1]["modules"],
+                    "status": max(run["status"] for run in runs),
+                }
+        self.print_report(results)
+        return None
+
+    @staticmethod
+    def environment(static_root):
+        env = {
+            **os.environ,
+            "DJANGO_STATIC_ROOT": static_root,
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(settings.BASE_DIR),
+                              os.environ.get("PYTHONPATH")])),
+        }
+        # Боевой профиль требует ключ; для замера годится случайный.
+        env.setdefault("DJANGO_SECRET_KEY", secrets.token_urlsafe(50))
+        return env
+
+    def run_child(self, args, env):
+        completed = subprocess.run(
+            [sys.executable, *args], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(
+                f"{env['DJANGO_SETTINGS_MODULE']}: "
+                f"{completed.stderr.strip().splitlines()[-1:]}")
+        return completed.stdout
+
+    def collectstatic(self, env):
+        self.run_child(
+            ["-m", "django", "collectstatic", "--noinput", "-v", "0"], env)
+
+    def measure(self, env, path):
+        started = time.perf_counter()
+        output = self.run_child(["-c", CHILD_SCRIPT, path], env)
+        return {**json.loads(output),
+                "wall_ms": (time.perf_counter() - started) * 1000}
+
+    def print_report(self, results):
+        self.stdout.write(
+            f"{'профиль':<13}{'процесс':>10}{'импорт':>10}"
+            f"{'1-й запрос':>12}{'2-й запрос':>12}{'модули':>8}{'код':>5}")
+        for profile, stats in results.items():
+            self.stdout.write(
+                f"{profile:<13}"
+                + "".join(f"{stats[metric]:>{width}.1f}" for metric, width
+                          in zip(METRICS, (10, 10, 12, 12)))
+                + f"{stats['modules']:>8}{stats['status']:>5}")
+        if {"development", "production"} <= set(results):
+            development = results["development"]
+            production = results["production"]
+            for metric in ("import_ms", "first_request_ms"):
+                before, after = development[metric], production[metric]
+                change = (after - before) / before * 100 if before else 0.0
+                self.stdout.write(
+                    f"production/{metric}: {before:.1f} → {after:.1f} мс "
+                    f"({change:+.1f}%)")
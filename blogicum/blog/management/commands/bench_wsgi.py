@@ -0,0 +1,387 @@
+import io
+import json
+import multiprocessing
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY)
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from django.utils.http import urlencode
+
+from blog.models import Category, Post, User
+from blog.seeding import seed_dataset
+from blogicum.wsgi import application
+
+# Маршрут: (вес в смеси, метод). URL для каждого запроса строит route_url.
+ROUTES = {
+    "index": (30, "GET"),
+    "index_page": (5, "GET"),
+    "category": (15, "GET"),
+    "profile": (10, "GET"),
+    "post_detail": (30, "GET"),
+    "add_comment": (5, "POST"),
+    "pages": (5, "GET"),
+}
+PERCENTILES = (50, 95, 99)
+CSRF_SECRET = get_random_string(CSRF_SECRET_LENGTH, CSRF_ALLOWED_CHARS)
+REMOTE_ADDR = "127.0.0.1"
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+FILE_BACKEND = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, -(-percent * len(sorted_values) // 100) - 1)
+    return sorted_values[int(rank)]
+
+
+class Dataset:
+    """Идентификаторы, из которых собираются URL запросов."""
+
+    def __init__(self, sample=200):
+        self.post_ids = list(
+            Post.objects.filter(is_visible=True)
+            .order_by("-pub_date").values_list("id", flat=True)[:sample])
+        self.category_slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list("slug", flat=True)[:sample])
+        self.usernames = list(
+            User.objects.filter(posts__isnull=False).distinct()
+            .values_list("username", flat=True)[:sample])
+        self.num_pages = max(1, Post.objects.filter(is_visible=True).count()
+                             // 10)
+        if not (self.post_ids and self.category_slugs and self.usernames):
+            raise CommandError(
+                "В базе нет видимых постов: запустите без --no-seed.")
+        self.session_cookie = self.login(
+            User.objects.get(username=self.usernames[0]))
+
+    @staticmethod
+    def login(user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def route_url(self, route, rng):
+        """URL и данные формы (для POST) очередного запроса маршрута."""
+        if route == "index_page":
+            page = rng.randint(1, self.num_pages)
+            return f"{reverse('blog:index')}?page={page}", None
+        if route == "add_comment":
+            url = reverse("blog:add_comment",
+                          args=[rng.choice(self.post_ids)])
+            return url, {"text": "Нагрузочный комментарий"}
+        urls = {
+            "index": lambda: reverse("blog:index"),
+            "category": lambda: reverse(
+                "blog:category_posts", args=[rng.choice(self.category_slugs)]),
+            "profile": lambda: reverse(
+                "blog:profile", args=[rng.choice(self.usernames)]),
+            "post_detail": lambda: reverse(
+                "blog:post_detail", args=[rng.choice(self.post_ids)]),
+            "pages": lambda: reverse(
+                rng.choice(("pages:about", "pages:rules"))),
+        }
+        return urls[route](), None
+
+
+def make_environ(dataset, path, data=None):
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "REMOTE_ADDR": REMOTE_ADDR,
+        "SERVER_NAME": "127.0.0.1",
+        "HTTP_HOST": "127.0.0.1",
+    }
+    if data is not None:
+        body = urlencode(data).encode()
+        environ.update({
+            "REQUEST_METHOD": "POST",
+            "CONTENT_TYPE": "application/x-www-form-urlencoded",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+            "HTTP_COOKIE": (f"{settings.SESSION_COOKIE_NAME}="
+                            f"{dataset.session_cookie}; "
+                            f"{settings.CSRF_COOKIE_NAME}={CSRF_SECRET}"),
+            "HTTP_X_CSRFTOKEN": CSRF_SECRET,
+        })
+    setup_testing_defaults(environ)
+    return environ
+
+
+def call_app(environ):
+    status = []
+
+    def start_response(status_line, headers, exc_info=None):
+        status.append(int(status_line.split(" ", 1)[0]))
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return status[0]
+
+
+def run_worker(dataset, schedule, seed):
+    """Выполняет свою долю запросов; возвращает {маршрут: [задержки]}."""
+    rng = random.Random(seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for route in schedule:
+        path, data = dataset.route_url(route, rng)
+        environ = make_environ(dataset, path, data)
+        started = time.perf_counter()
+        status = call_app(environ)
+        latencies[route].append(time.perf_counter() - started)
+        if status >= 400:
+            errors[route] += 1
+    connections.close_all()
+    return dict(latencies), dict(errors)
+
+
+def _process_worker(args):
+    return run_worker(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон blogicum.wsgi.application внутри процесса: "
+        "взвешенная смесь маршрутов блога и страниц на временной базе, "
+        "req/s и p50/p95/p99 по маршрутам, сравнение с JSON-базовой линией."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000,
+                            help="Сколько запросов выполнить.")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Число потоков или процессов.")
+        parser.add_argument("--processes", action="store_true",
+                            help="Процессы (fork) вместо потоков.")
+        parser.add_argument("--warmup", type=int, default=100,
+                            help="Запросы для прогрева, в отчёт не входят.")
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--comments", type=int, default=5000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Зерно генератора данных и смеси запросов.")
+        parser.add_argument(
+            "--no-seed", action="store_true",
+            help="Не создавать временную базу, а гонять текущую "
+                 "(POST-запросы добавят в неё комментарии).",
+        )
+        parser.add_argument(
+            "--baseline", type=Path,
+            help="JSON базовой линии: если файла нет — записать, "
+                 "иначе сравнить с ним.",
+        )
+        parser.add_argument("--update-baseline", action="store_true",
+                            help="Перезаписать базовую линию результатом.")
+        parser.add_argument(
+            "--tolerance", type=float, default=10.0,
+            help="Допустимое ухудшение req/s и p95 относительно базовой "
+                 "линии (проценты).",
+        )
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Завершиться с ошибкой при регрессии.")
+        parser.add_argument("--debug", action="store_true",
+                            help="Не отключать DEBUG на время прогона.")
+
+    def handle(self, *args, **options):
+        # С DEBUG=True Django копит все SQL-запросы, а debug_toolbar
+        # встраивается в ответы — цифры были бы далеки от боевых.
+        with override_settings(DEBUG=options["debug"]):
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        with ExitStack() as stack:
+            if not options["no_seed"]:
+                self.directory = tempfile.TemporaryDirectory(
+                    prefix="blogicum-bench-")
+                stack.callback(self.directory.cleanup)
+                stack.enter_context(self.temporary_caches())
+                old_name = self.create_database(options)
+                stack.callback(connection.creation.destroy_test_db,
+                               old_name, verbosity=0)
+            dataset = Dataset()
+            report = self.run(dataset, options)
+        self.print_report(report)
+        if options["baseline"]:
+            self.handle_baseline(report, options)
+
+    def temporary_caches(self):
+        """
+        Кэши и блокировки страниц во временном каталоге: иначе страницы
+        и версии тегов временной базы попали бы в общий кэш работающего
+        сайта (и наоборот). Кэши в памяти процесса и так не общие.
+        """
+        directory = Path(self.directory.name)
+        bench_caches = {}
+        for alias, config in settings.CACHES.items():
+            location = str(directory / "cache" / alias)
+            if config["BACKEND"] == LOCMEM_BACKEND:
+                bench_caches[alias] = config
+            elif config["BACKEND"] == FILE_BACKEND:
+                bench_caches[alias] = {**config, "LOCATION": location}
+            else:
+                bench_caches[alias] = {"BACKEND": FILE_BACKEND,
+                                       "LOCATION": location}
+        return override_settings(
+            CACHES=bench_caches,
+            BLOG_PAGE_CACHE_LOCK_DIR=str(directory / "locks"),
+        )
+
+    def create_database(self, options):
+        old_name = connection.settings_dict["NAME"]
+        # Временная файловая база с тем же профилем (WAL и т. д.): общая
+        # in-memory база SQLite блокирует таблицы целиком и не годится
+        # для параллельных запросов, а процессам и вовсе не видна.
+        connection.settings_dict["TEST"]["NAME"] = str(
+            Path(self.directory.name) / "bench.sqlite3")
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        created = seed_dataset(
+            users=options["users"], categories=options["categories"],
+            posts=options["posts"], comments=options["comments"],
+            seed=options["seed"],
+        )
+        self.stdout.write("Данные: " + ", ".join(
+            f"{name}={count}" for name, count in created.items()))
+        return old_name
+
+    def schedule(self, count, rng):
+        names = list(ROUTES)
+        weights = [ROUTES[name][0] for name in names]
+        return rng.choices(names, weights=weights, k=count)
+
+    def run(self, dataset, options):
+        rng = random.Random(options["seed"])
+        workers = max(1, options["workers"])
+        if options["warmup"]:
+            run_worker(dataset, self.schedule(options["warmup"], rng),
+                       options["seed"])
+        schedule = self.schedule(options["requests"], rng)
+        shares = [(dataset, schedule[i::workers], options["seed"] + i)
+                  for i in range(workers)]
+        started = time.perf_counter()
+        if options["processes"]:
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            with context.Pool(workers) as pool:
+                results = pool.map(_process_worker, shares)
+        else:
+            results = [None] * workers
+            threads = [
+                threading.Thread(
+                    target=lambda i=i: results.__setitem__(
+                        i, run_worker(*shares[i])))
+                for i in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+        return self.summarize(results, elapsed, options)
+
+    def summarize(self, results, elapsed, options):
+        latencies, errors = defaultdict(list), defaultdict(int)
+        for worker_latencies, worker_errors in results:
+            for route, values in worker_latencies.items():
+                latencies[route].extend(values)
+            for route, count in worker_errors.items():
+                errors[route] += count
+        routes = {}
+        for route in sorted(latencies):
+            values = sorted(latencies[route])
+            routes[route] = {
+                "requests": len(values),
+                "errors": errors[route],
+                "rps": len(values) / elapsed,
+                **{f"p{p}_ms": percentile(values, p) * 1000
+                   for p in PERCENTILES},
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "config": {
+                key: options[key] for key in (
+                    "requests", "workers", "processes", "posts",
+                    "comments", "users", "categories", "seed")
+            },
+            "elapsed_s": elapsed,
+            "rps": total / elapsed if elapsed else 0.0,
+            "routes": routes,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{'маршрут':<14}{'запросы':>9}{'ошибки':>8}{'req/s':>10}"
+            + "".join(f"{'p' + str(p) + ', мс':>12}" for p in PERCENTILES))
+        for route, stats in report["routes"].items():
+            self.stdout.write(
+                f"{route:<14}{stats['requests']:>9}{stats['errors']:>8}"
+                f"{stats['rps']:>10.1f}"
+                + "".join(f"{stats[f'p{p}_ms']:>12.2f}" for p in PERCENTILES))
+        self.stdout.write(self.style.SUCCESS(
+            f"Всего: {report['rps']:.1f} req/s"
+            f" за {report['elapsed_s']:.2f} с"))
+
+    def handle_baseline(self, report, options):
+        path = options["baseline"]
+        if not path.exists() or options["update_baseline"]:
+            path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+            self.stdout.write(f"Базовая линия записана: {path}")
+            return
+        baseline = json.loads(path.read_text())
+        regressions = compare(baseline, report, options["tolerance"])
+        for line in regressions:
+            self.stdout.write(self.style.WARNING(line))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(
+                f"Регрессий относительно {path} нет."))
+        elif options["fail_on_regression"]:
+            raise CommandError(
+                f"Регрессия производительности: {len(regressions)}.")
+
+
+def compare(baseline, report, tolerance):
+    """Строки с ухудшениями req/s и p95 больше tolerance процентов."""
+    regressions = []
+    limit = tolerance / 100
+    pairs = [("всего", baseline, report)] + [
+        (route, baseline["routes"][route], stats)
+        for route, stats in report["routes"].items()
+        if route in baseline.get("routes", {})
+    ]
+    for name, old, new in pairs:
+        if old["rps"] and new["rps"] < old["rps"] * (1 - limit):
+            regressions.append(
+                f"{name}: req/s {old['rps']:.1f} → {new['rps']:.1f}")
+        if old.get("p95_ms") and new["p95_ms"] > old["p95_ms"] * (1 + limit):
+            regressions.append(
+                f"{name}: p95 {old['p95_ms']:.2f} → {new['p95_ms']:.2f} мс")
+    return regressions
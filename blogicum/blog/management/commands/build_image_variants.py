@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from blog import cache, images
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит уменьшенные JPEG/WebP-копии изображений постов, "
+        "у которых их ещё нет (например, загруженных до появления "
+        "вариантов)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Перестроить варианты у всех постов с изображением.",
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        posts = Post.objects.exclude(image="").only("pk", "image",
+                                                    "image_variants")
+        for post in posts.iterator(chunk_size=200):
+            if options["force"]:
+                images.delete_variants(post.image_variants)
+                post.image_variants = {}
+            before = post.image_variants
+            post.refresh_image_variants()
+            if post.image_variants != before:
+                Post.objects.filter(pk=post.pk).update(
+                    image_variants=post.image_variants)
+                # update() не отправляет сигналов — карточки и страницы
+                # со старым srcset сбрасываются вручную.
+                cache.bump_tags(f"post:{post.pk}")
+                built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Варианты построены для постов: {built}"))
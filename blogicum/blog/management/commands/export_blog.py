@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from blog import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая выгрузка постов или комментариев в NDJSON/CSV "
+        "за постоянную память (в отличие от dumpdata)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(export.EXPORTS))
+        parser.add_argument("--format", choices=sorted(export.FORMATS),
+                            default="ndjson", dest="fmt")
+        parser.add_argument("--author", help="Имя пользователя автора.")
+        parser.add_argument("--category", help="Слаг категории.")
+        parser.add_argument("--chunk-size", type=int,
+                            default=export.DEFAULT_CHUNK_SIZE,
+                            help="Строк в одной порции чтения из базы.")
+        parser.add_argument("-o", "--output",
+                            help="Файл для выгрузки (по умолчанию stdout).")
+
+    def handle(self, *args, **options):
+        lines = export.render(
+            options["kind"],
+            options["fmt"],
+            author=options["author"],
+            category=options["category"],
+            chunk_size=options["chunk_size"],
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8",
+                  newline="") as output:
+            output.writelines(lines)
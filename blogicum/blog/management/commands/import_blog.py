@@ -0,0 +1,73 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from blog.importer import CONFLICT_MODES, FixtureError, FixtureImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая загрузка фикстуры формата dumpdata (JSON-массив как "
+        "db.json или JSONL) пачками bulk_create за постоянную память."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixture",
+                            help="Путь к файлу фикстуры или - для stdin.")
+        parser.add_argument("--batch-size", type=int, default=2000,
+                            help="Объектов в одной пачке и транзакции.")
+        parser.add_argument(
+            "--on-conflict", choices=CONFLICT_MODES, default="error",
+            help="Что делать с уже существующими первичными ключами.")
+        parser.add_argument(
+            "-e", "--exclude", action="append", default=[],
+            help="Пропустить приложение или модель (app или app.Model).")
+        parser.add_argument(
+            "--skip-missing", action="store_true",
+            help="Пропускать объекты со ссылками на отсутствующие строки "
+                 "вместо остановки загрузки.")
+        parser.add_argument(
+            "--drop-indexes", action="store_true",
+            help="Снять вторичные индексы и триггеры на время загрузки "
+                 "и построить их заново в конце (только SQLite).")
+
+    def handle(self, *args, **options):
+        if options["drop_indexes"] and connection.vendor != "sqlite":
+            raise CommandError("--drop-indexes поддерживается только SQLite.")
+        importer = FixtureImporter(
+            batch_size=options["batch_size"],
+            on_conflict=options["on_conflict"],
+            exclude=options["exclude"],
+            skip_missing=options["skip_missing"],
+            drop_indexes=options["drop_indexes"],
+            progress=self.progress if options["verbosity"] > 1 else None,
+        )
+        # С DEBUG=True Django копил бы текст каждого INSERT в памяти.
+        with override_settings(DEBUG=False):
+            try:
+                counts = self.load(importer, options["fixture"])
+            except FixtureError as error:
+                raise CommandError(error)
+        elapsed = importer.elapsed
+        for label, count in counts.items():
+            skipped = importer.skipped.get(label)
+            self.stdout.write(
+                f"{label}: {count}"
+                + (f" (пропущено: {skipped})" if skipped else ""))
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Загружено объектов: {total} за {elapsed:.1f} с "
+            f"({total / elapsed if elapsed else 0:.0f} строк/с)"))
+
+    def load(self, importer, path):
+        if path == "-":
+            return importer.load(sys.stdin)
+        with open(path, encoding="utf-8") as stream:
+            return importer.load(stream)
+
+    def progress(self, label, count, elapsed):
+        self.stdout.write(
+            f"{label}: {count} ({count / elapsed if elapsed else 0:.0f}"
+            " строк/с)")
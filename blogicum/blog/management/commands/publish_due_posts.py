@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import cache
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Открывает в лентах отложенные посты, чья дата публикации "
+        "наступила. С --loop работает как планировщик."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Не завершаться, а проверять посты каждые --interval секунд.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=60,
+            help="Пауза между проверками в режиме --loop (секунды).",
+        )
+        parser.add_argument(
+            "--all", action="store_true", dest="full",
+            help="Пересчитать флаг видимости у всех постов, а не только "
+                 "у отложенных.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.publish(options["full"], options["verbosity"])
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def publish(self, full, verbosity):
+        posts = Post.objects.all()
+        if not full:
+            posts = posts.filter(
+                is_visible=False, pub_date__lte=timezone.now())
+        changed = posts.refresh_visibility()
+        if changed:
+            cache.bump_tags(cache.FEEDS_TAG)
+        if changed and verbosity or verbosity > 1:
+            self.stdout.write(f"Видимость обновлена у постов: {changed}")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованные счётчики комментариев у постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--post", type=int, action="append", dest="posts",
+            help="Пересчитать только указанные посты (можно повторять).",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options["posts"]:
+            queryset = queryset.filter(pk__in=options["posts"])
+        updated = queryset.rebuild_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"Счётчики пересчитаны для постов: {updated}"))
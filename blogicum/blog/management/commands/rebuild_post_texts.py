@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from blog import cache, rendering
+from blog.models import Post
+
+BATCH_SIZE = 1000
+
+
+def rebuild_post_texts(queryset=None, batch_size=BATCH_SIZE):
+    """
+    Пересчёт Post.excerpt и Post.text_html пачками; записываются только
+    изменившиеся строки. Возвращает их число.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    rows = queryset.order_by().only("id", "text", "excerpt", "text_html")
+    changed, updated = [], 0
+    for post in rows.iterator(chunk_size=batch_size):
+        excerpt = rendering.make_excerpt(post.text)
+        text_html = rendering.make_html(post.text)
+        if (post.excerpt, post.text_html) == (excerpt, text_html):
+            continue
+        post.excerpt, post.text_html = excerpt, text_html
+        changed.append(post)
+        if len(changed) >= batch_size:
+            updated += _save(changed)
+            changed = []
+    return updated + _save(changed)
+
+
+def _save(posts):
+    if not posts:
+        return 0
+    Post.objects.bulk_update(posts, ["excerpt", "text_html"])
+    # bulk_update не отправляет сигналов — карточки и страницы
+    # с устаревшим текстом сбрасываются вручную.
+    cache.bump_tags(cache.FEEDS_TAG, *(f"post:{post.pk}" for post in posts))
+    return len(posts)
+
+
+class Command(BaseCommand):
+    help = ("Заполняет анонсы и HTML текста постов "
+            "(после загрузки данных в обход save()).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--post", type=int, action="append", dest="posts",
+            help="Пересчитать только указанные посты (можно повторять).",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options["posts"]:
+            queryset = queryset.filter(pk__in=options["posts"])
+        updated = rebuild_post_texts(queryset, options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Тексты пересчитаны для постов: {updated}"))
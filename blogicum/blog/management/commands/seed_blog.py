@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from blog.seeding import Skew, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует синтетический блог заданного размера пачками "
+        "bulk_create: пользователи, категории, локации, посты, "
+        "комментарии — с перекосами, как на живом сайте."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--locations", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--comments", type=int, default=500_000)
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Строк в одной пачке и транзакции.")
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Зерно генератора: тот же набор данных.")
+        parser.add_argument(
+            "--hot-authors", type=float, default=0.01,
+            help="Доля «горячих» авторов.")
+        parser.add_argument(
+            "--hot-author-share", type=float, default=0.5,
+            help="Доля постов, написанных «горячими» авторами.")
+        parser.add_argument(
+            "--hot-posts", type=float, default=0.01,
+            help="Доля «горячих» постов.")
+        parser.add_argument(
+            "--hot-post-share", type=float, default=0.5,
+            help="Доля комментариев к «горячим» постам.")
+        parser.add_argument(
+            "--future-posts", type=float, default=0.05,
+            help="Доля отложенных постов с датой в будущем.")
+        parser.add_argument(
+            "--unpublished-posts", type=float, default=0.02,
+            help="Доля снятых с публикации постов.")
+        parser.add_argument(
+            "--unpublished-categories", type=float, default=0.1,
+            help="Доля снятых с публикации категорий.")
+
+    def handle(self, *args, **options):
+        # С DEBUG=True Django хранит текст каждого запроса, а INSERT
+        # на тысячи строк — это мегабайты: память росла бы с объёмом.
+        with override_settings(DEBUG=False):
+            self.seed(options)
+
+    def seed(self, options):
+        skew = Skew(
+            hot_authors=options["hot_authors"],
+            hot_author_share=options["hot_author_share"],
+            hot_posts=options["hot_posts"],
+            hot_post_share=options["hot_post_share"],
+            future_posts=options["future_posts"],
+            unpublished_posts=options["unpublished_posts"],
+            unpublished_categories=options["unpublished_categories"],
+        )
+        started = time.monotonic()
+        created = seed_dataset(
+            users=options["users"],
+            categories=options["categories"],
+            locations=options["locations"],
+            posts=options["posts"],
+            comments=options["comments"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            skew=skew,
+            progress=self.progress if options["verbosity"] > 1 else None,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            "Создано за {:.1f} с: {}".format(elapsed, ", ".join(
+                f"{name}={count}" for name, count in created.items()))))
+
+    def progress(self, model, done, total):
+        self.stdout.write(f"{model}: {done}/{total}")
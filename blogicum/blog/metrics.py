@@ -0,0 +1,78 @@
+"""
+Метрики блога в текстовом формате Prometheus для /metrics.
+
+Всё считается в памяти процесса (у каждого WSGI-воркера свои
+значения, Prometheus суммирует их по меткам instance): запись —
+инкремент под блокировкой, чтение — снимок при запросе /metrics.
+"""
+from core.metrics import (EventRate, exposition, histogram_samples,
+                          request_metrics)
+
+from . import cache, lookups
+
+posts_created = EventRate()
+comments_created = EventRate()
+
+REQUEST_HISTOGRAMS = (
+    ("blog_request_duration_seconds", "duration",
+     "Время обработки запроса по имени URL."),
+    ("blog_request_db_queries", "sql_queries",
+     "Число SQL-запросов на запрос по имени URL."),
+    ("blog_request_db_seconds", "sql_time",
+     "Время SQL-запросов на запрос по имени URL."),
+    ("blog_request_template_seconds", "template_time",
+     "Время рендера шаблона по имени URL."),
+)
+
+CACHES = (
+    ("page", cache.page_cache_stats),
+    ("fragment", cache.fragment_cache_stats),
+    ("count", cache.count_cache_stats),
+    ("lookup_local", lookups.local_stats),
+    ("lookup_shared", lookups.shared_stats),
+)
+
+EVENTS = (
+    ("posts", posts_created),
+    ("comments", comments_created),
+)
+
+
+def render() -> str:
+    views = sorted(request_metrics.snapshot().items())
+    parts = [
+        exposition(name, "histogram", help_text, [
+            sample
+            for view_name, histograms in views
+            for sample in histogram_samples(
+                histograms[key], {"view": view_name})
+        ])
+        for name, key, help_text in REQUEST_HISTOGRAMS
+    ]
+    stats = [(name, cache_stats.snapshot()) for name, cache_stats in CACHES]
+    parts.append(exposition(
+        "blog_cache_requests_total", "counter",
+        "Обращения к кэшу страниц и карточек по результату.",
+        [(("", {"cache": name, "result": result}), snapshot[key])
+         for name, snapshot in stats
+         for result, key in (("hit", "hits"), ("miss", "misses"),
+                             ("stale", "stale"))],
+    ))
+    parts.append(exposition(
+        "blog_cache_hit_ratio", "gauge",
+        "Доля попаданий в кэш с запуска процесса.",
+        [(("", {"cache": name}), snapshot["ratio"])
+         for name, snapshot in stats],
+    ))
+    for name, rate in EVENTS:
+        parts.append(exposition(
+            f"blog_{name}_created_total", "counter",
+            "Создано с запуска процесса.",
+            [(("", {}), rate.total)],
+        ))
+        parts.append(exposition(
+            f"blog_{name}_created_last_minute", "gauge",
+            "Создано за последние 60 секунд.",
+            [(("", {}), rate.last_minute())],
+        ))
+    return "".join(parts)
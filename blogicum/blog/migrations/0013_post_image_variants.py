@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Размеры оригинала и уменьшенные JPEG/WebP-копии.', verbose_name='Варианты изображения'),
+        ),
+    ]
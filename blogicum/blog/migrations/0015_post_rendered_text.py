@@ -0,0 +1,65 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:06
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr, truncatewords
+from django.utils.text import Truncator
+
+search_index = import_module('blog.migrations.0014_post_search_index')
+
+
+def recreate_search_triggers(apps, schema_editor):
+    # AddField/RemoveField в SQLite пересоздают таблицу blog_post,
+    # а вместе с ней пропадают триггеры полнотекстового индекса.
+    search_index.run_sqlite(
+        search_index.DROP_SQL[:-1] + search_index.CREATE_SQL[1:]
+    )(apps, schema_editor)
+
+
+# Копия blog.rendering на момент миграции: её результат не должен
+# меняться вместе с кодом приложения.
+def make_excerpt(text):
+    return Truncator(truncatewords(text, 10)).chars(256)
+
+
+def make_html(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def fill_rendered_text(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for post in Post.objects.only('id', 'text').iterator(chunk_size=1000):
+        post.excerpt = make_excerpt(post.text)
+        post.text_html = make_html(post.text)
+        posts.append(post)
+        if len(posts) >= 1000:
+            Post.objects.bulk_update(posts, ['excerpt', 'text_html'])
+            posts = []
+    Post.objects.bulk_update(posts, ['excerpt', 'text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Первые слова текста для карточек в лентах.', max_length=256, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, help_text='Экранированный текст с <br> для страницы поста.', verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(
+            recreate_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
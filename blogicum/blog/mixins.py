@@ -1,56 +1,323 @@
-from django.db.models import Count
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import redirect
+from django.template.response import SimpleTemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from core.middleware import render_timed
 
+from . import cache, lookups
 from .models import Comment, Post
+from .paginators import (CachedCountPaginator, InvalidCursor,
+                         KeysetPaginator)
 
 PAGE_SIZE = 10
+COMMENTS_PAGE_SIZE = 50
 
 
 class CustomListMixin:
     """
     Общий queryset для списков постов:
     связи, счётчик комментариев, сортировка.
+
+    Длинные text и text_html в лентах не нужны и не выбираются:
+    карточки показывают готовый анонс Post.excerpt.
+
+    При включённой настройке BLOG_CURSOR_PAGINATION лента листается
+    по курсору (?cursor=) с ключом (pub_date, id); старые ссылки
+    вида ?page=N продолжают обслуживаться обычным пагинатором.
+    Номера страниц в шаблон попадают окном с многоточиями (page_range),
+    а не все подряд: размер ответа не растёт вместе с числом страниц.
+    Число постов для пагинатора кэшируется, если вьюха называет ключ
+    и теги ленты (get_count_cache_key/get_count_cache_tags).
     """
 
     model = Post
     paginate_by = PAGE_SIZE
+    paginator_class = CachedCountPaginator
+    cursor_fields = ("pub_date", "id")
+    page_range_on_each_side = 2
+    page_range_on_ends = 1
 
     def get_queryset(self):
         return (
             Post.objects.select_related("category", "location", "author")
-            .annotate(comment_count=Count("comments"))
-            .order_by("-pub_date")
+            .defer("text", "text_html")
+            .order_by("-pub_date", "-id")
         )
 
+    def get_count_cache_key(self):
+        """Ключ кэша числа постов ленты; None — считать каждый раз."""
+        return None
 
-class PostChangeMixin:
-    """Проверка авторства при изменении/удалении поста."""
+    def get_count_cache_tags(self):
+        return []
 
-    model = Post
-    template_name = "blog/create.html"
-    pk_url_kwarg = "post_id"
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page,
+            count_key=self.get_count_cache_key(),
+            count_tags=self.get_count_cache_tags(),
+            **kwargs,
+        )
+
+    def use_cursor_pagination(self):
+        if "cursor" in self.request.GET:
+            return True
+        return (getattr(settings, "BLOG_CURSOR_PAGINATION", False)
+                and "page" not in self.request.GET)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size,
+                                    fields=self.cursor_fields)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Неверный курсор страницы.")
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_page_cache_tags(self, context):
+        """Теги страницы ленты: посты на ней (вьюха добавляет теги ленты)."""
+        tags = []
+        for post in context.get("page_obj") or ():
+            tags.extend(cache.post_tags(post))
+        return tags
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context["page_obj"]
+        if page is not None and not getattr(page, "is_cursor", False):
+            context["page_range"] = list(
+                page.paginator.get_elided_page_range(
+                    page.number,
+                    on_each_side=self.page_range_on_each_side,
+                    on_ends=self.page_range_on_ends,
+                ))
+        if cache.get_fragment_timeout() > 0:
+            cache.attach_card_versions(page or ())
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кэш целых страниц для анонимных GET-запросов.
+    Вьюха перечисляет теги, от которых зависит страница,
+    а сигналы моделей инвалидируют их (см. blog.cache).
+
+    С page_cache_coalesce = True (горячие ленты) страницу собирает
+    только воркер, взявший блокировку её ключа: при промахе остальные
+    ждут его результата, а устаревшую запись получают сразу, не дожидаясь
+    пересборки (stale-while-revalidate).
+    """
+
+    page_cache_coalesce = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if not cache.is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = cache.page_key(request)
+        if self.page_cache_coalesce:
+            return self._coalesced_dispatch(key, request, *args, **kwargs)
+        response = cache.get_page(key, request)
+        if response is not None:
+            return response
+        return self._dispatch_and_store(key, request, *args, **kwargs)
+
+    def _dispatch_and_store(self, key, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            response.add_post_render_callback(partial(self._store_page, key))
+        return response
+
+    def _coalesced_dispatch(self, key, request, *args, **kwargs):
+        entry, fresh = cache.get_page_entry(key)
+        if fresh:
+            cache.page_cache_stats.hit()
+            return cache.page_response(entry, request)
+        if entry is None and cache.is_uncacheable(key):
+            # Ждать нечего: другой воркер всё равно ничего не сохранит.
+            cache.page_cache_stats.miss()
+            return self._dispatch_and_store(key, request, *args, **kwargs)
+        if entry is not None and cache.get_page_stale_timeout() > 0:
+            with cache.page_locks.acquire(key, blocking=False) as acquired:
+                if acquired:
+                    return self._render_page(key, request, *args, **kwargs)
+            cache.page_cache_stats.stale_hit()
+            return cache.page_response(entry, request)
+        with cache.page_locks.acquire(
+                key, timeout=cache.get_page_lock_timeout()):
+            # Пока ждали блокировку, страницу мог собрать другой воркер.
+            entry, fresh = cache.get_page_entry(key)
+            if fresh:
+                cache.page_cache_stats.hit()
+                return cache.page_response(entry, request)
+            return self._render_page(key, request, *args, **kwargs)
+
+    def _render_page(self, key, request, *args, **kwargs):
+        """
+        Сборка и сохранение страницы под блокировкой её ключа. Рендер
+        идёт здесь же, чтобы ждущие воркеры нашли страницу в кэше;
+        его время учитывает render_timed().
+        """
+        cache.page_cache_stats.miss()
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Http404:
+            cache.remember_uncacheable(key)
+            raise
+        if not isinstance(response, SimpleTemplateResponse) or (
+                response.status_code != 200):
+            cache.remember_uncacheable(key)
+            return response
+        response.add_post_render_callback(partial(self._store_page, key))
+        return render_timed(request, response)
+
+    def _store_page(self, key, response):
+        cache.store_page(key, self.request, response,
+                         self.get_page_cache_tags(response.context_data))
+
+
+class ConditionalGetMixin:
+    """
+    Ответ 304 Not Modified на If-None-Match, а там, где вьюха знает дату
+    изменения страницы (get_last_modified()), и на If-Modified-Since.
+
+    Валидаторы не запрашиваются из базы: отдавая 200, вьюха запоминает
+    версии тегов страницы (get_page_cache_tags(), см. blog.cache), и
+    условный запрос лишь сверяет их с текущими. В ETag входят версия
+    профиля посетителя и его CSRF-cookie — после повторного входа или
+    смены имени страница с новым токеном и шапкой собирается заново.
+    """
 
     def dispatch(self, request, *args, **kwargs):
-        obj = self.get_object()
-        if obj.author != request.user:
+        if (request.method not in ("GET", "HEAD")
+                or cache.get_validators_timeout() <= 0):
+            return super().dispatch(request, *args, **kwargs)
+        key = cache.validators_key(request)
+        if ("If-None-Match" in request.headers
+                or "If-Modified-Since" in request.headers):
+            entry = cache.get_validators(key)
+            if entry is not None:
+                response = get_conditional_response(
+                    request,
+                    etag=self.get_etag(entry),
+                    last_modified=entry["last_modified"],
+                )
+                if response is not None:
+                    return response
+        response = super().dispatch(request, *args, **kwargs)
+        if (isinstance(response, SimpleTemplateResponse)
+                and response.status_code == 200):
+            response.add_post_render_callback(
+                partial(self._store_validators, key))
+        return response
+
+    def get_etag(self, entry):
+        # Страница с CSRF-токеном годна только при том же секрете CSRF.
+        csrf_secret = (self.request.META.get("CSRF_COOKIE")
+                       if entry["csrf"] else None)
+        return quote_etag(hashlib.md5(
+            repr((
+                self.request.get_full_path(),
+                self.request.user.pk,
+                csrf_secret,
+                sorted(entry["tags"].items()),
+            )).encode(),
+            usedforsecurity=False,
+        ).hexdigest())
+
+    def get_last_modified(self, context):
+        """Дата изменения страницы; None — Last-Modified не отдаётся."""
+        return None
+
+    def _store_validators(self, key, response):
+        context = response.context_data
+        tags = list(self.get_page_cache_tags(context))
+        if self.request.user.is_authenticated:
+            tags.append(f"user:{self.request.user.pk}")
+        last_modified = self.get_last_modified(context)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        entry = cache.store_validators(
+            key, tags, last_modified,
+            csrf=bool(self.request.META.get("CSRF_COOKIE_NEEDS_UPDATE")))
+        response.headers.setdefault("ETag", self.get_etag(entry))
+        if last_modified is not None:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified))
+
+
+class VisiblePostMixin:
+    """
+    Пост с проверкой видимости и постраничные комментарии к нему.
+    Свой пост доступен всегда; чужой — только если виден в лентах.
+    """
+
+    def get_visible_post(self, pk):
+        post = lookups.get_post(pk)
+        if post.author_id != self.request.user.pk and not post.is_visible:
+            raise Http404("Публикация не найдена.")
+        return post
+
+    def get_comments_context(self, post, cursor=None):
+        """
+        Порция комментариев по ключу (created_at, id): первая страница
+        поста строится за постоянное время при любом числе комментариев.
+        """
+        paginator = KeysetPaginator(
+            post.comments.select_related("author"),
+            COMMENTS_PAGE_SIZE,
+            fields=("created_at", "id"),
+            descending=False,
+        )
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404("Неверный курсор комментариев.")
+        return {"comments": page.object_list, "comments_page": page}
+
+
+class AuthorRequiredMixin:
+    """
+    Изменять объект может только его автор. Объект загружается один раз:
+    проверка сравнивает author_id без запроса к таблице пользователей,
+    а UpdateView/DeleteView получают тот же экземпляр из get_object().
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if self.object.author_id != request.user.pk:
             return redirect("blog:post_detail", pk=self.kwargs.get("post_id"))
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        if getattr(self, "_object", None) is None:
+            self._object = super().get_object(queryset)
+        return self._object
+
+
+class PostChangeMixin(AuthorRequiredMixin):
+    """Проверка авторства при изменении/удалении поста."""
+
+    model = Post
+    template_name = "blog/create.html"
+    pk_url_kwarg = "post_id"
+
 
-class CommentChangeMixin:
+class CommentChangeMixin(AuthorRequiredMixin):
     """Проверка авторства при изменении/удалении комментария."""
 
     model = Comment
     template_name = "blog/comment.html"
     pk_url_kwarg = "comment_id"
 
-    def dispatch(self, request, *args, **kwargs):
-        obj = self.get_object()
-        if obj.author != request.user:
-            return redirect("blog:post_detail", pk=self.kwargs.get("post_id"))
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         return reverse("blog:post_detail", kwargs={
             "pk": self.kwargs["post_id"]})
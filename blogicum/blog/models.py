@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 
-from core.models import PublicationTimestamps, BaseTitle
+from core.models import PublicationTimestamps, BaseTitle, UpdateTimestamp
+from . import images, rendering, search
 
 User = get_user_model()
 
@@ -10,7 +14,7 @@ MAX_STR_LENGTH = 30
 COMMENT_PREVIEW = 20
 
 
-class Location(PublicationTimestamps):
+class Location(PublicationTimestamps, UpdateTimestamp):
     """Местоположения постов."""
 
     name = models.CharField(
@@ -26,7 +30,7 @@ class Location(PublicationTimestamps):
         return self.name[:MAX_STR_LENGTH]
 
 
-class Category(PublicationTimestamps, BaseTitle):
+class Category(PublicationTimestamps, UpdateTimestamp, BaseTitle):
     """Категории постов."""
 
     description = models.TextField(verbose_name="Описание")
@@ -50,8 +54,75 @@ class Category(PublicationTimestamps, BaseTitle):
         return reverse("blog:category_posts",
                        kwargs={"category_slug": self.slug})
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.posts.refresh_visibility()
 
-class Post(PublicationTimestamps, BaseTitle):
+
+class PostQuerySet(models.QuerySet):
+    """Запросы к публикациям."""
+
+    def refresh_visibility(self):
+        """
+        Приведение флага is_visible в соответствие с публикацией поста,
+        его категории и датой публикации. Возвращает число изменённых строк.
+        """
+        now = timezone.now()
+        visible = models.Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=now,
+        )
+        shown = self.filter(visible, is_visible=False).update(
+            is_visible=True, updated_at=now)
+        hidden = self.filter(is_visible=True).exclude(visible).update(
+            is_visible=False, updated_at=now)
+        return shown + hidden
+
+    def rebuild_comment_counts(self):
+        """
+        Пересчёт comment_count одним UPDATE с подзапросом.
+        Возвращает число обновлённых постов.
+        """
+        counts = (
+            Comment.objects.filter(post=models.OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=models.Count("pk"))
+            .values("total")
+        )
+        return self.update(comment_count=Coalesce(
+            models.Subquery(counts), 0))
+
+    def matching(self, query):
+        """Посты, в заголовке или тексте которых есть все слова запроса."""
+        expression = search.fts_query(query)
+        if not expression:
+            return self.none()
+        return self.filter(
+            pk__in=RawSQL(search.matching_ids_sql(), [expression]))
+
+    def search(self, query):
+        """
+        Поиск с ранжированием: у постов появляются search_rank (bm25,
+        меньше — лучше) и search_snippet — фрагмент текста с совпадениями.
+        """
+        expression = search.fts_query(query)
+        if not expression:
+            return self.none()
+        table = search.FTS_TABLE
+        return self.extra(
+            select={
+                "search_rank": search.RANK_SQL,
+                "search_snippet": search.SNIPPET_SQL,
+            },
+            tables=[table],
+            where=[f"{table}.rowid = blog_post.id", f"{table} MATCH %s"],
+            params=[expression],
+        ).order_by("search_rank", "-pub_date", "-id")
+
+
+class Post(PublicationTimestamps, UpdateTimestamp, BaseTitle):
     """Публикации блога."""
 
     text = models.TextField(verbose_name="Текст")
@@ -82,17 +153,66 @@ class Post(PublicationTimestamps, BaseTitle):
         null=True,
         verbose_name="Категория",
     )
+    excerpt = models.CharField(
+        max_length=rendering.EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name="Анонс",
+        help_text="Первые слова текста для карточек в лентах.",
+    )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Текст в HTML",
+        help_text="Экранированный текст с <br> для страницы поста.",
+    )
     image = models.ImageField(
         verbose_name="Изображение",
         upload_to="post_images",
         blank=True,
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Варианты изображения",
+        help_text="Размеры оригинала и уменьшенные JPEG/WebP-копии.",
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Число комментариев",
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Виден в лентах",
+        help_text=(
+            "Опубликован, категория опубликована и дата публикации "
+            "наступила; отложенные посты открывает publish_due_posts."
+        ),
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date",)
         default_related_name = "posts"
+        # Условие is_visible вынесено в частичные индексы: Django
+        # сравнивает булево поле как голую колонку (WHERE is_visible),
+        # и SQLite не может использовать её как префикс составного индекса.
+        indexes = (
+            models.Index(fields=("pub_date",),
+                         condition=models.Q(is_visible=True),
+                         name="post_visible_date_idx"),
+            models.Index(fields=("category", "pub_date"),
+                         condition=models.Q(is_visible=True),
+                         name="post_category_visible_idx"),
+            models.Index(fields=("author", "pub_date"),
+                         name="post_author_date_idx"),
+        )
 
     def __str__(self) -> str:
         return self.title[:MAX_STR_LENGTH]
@@ -100,6 +220,79 @@ class Post(PublicationTimestamps, BaseTitle):
     def get_absolute_url(self) -> str:
         return reverse("blog:post_detail", kwargs={"pk": self.pk})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ленты, где пост был при загрузке, — для сброса их кэша
+        # при смене автора или категории без лишнего запроса.
+        if {"author_id", "category_id"} <= instance.__dict__.keys():
+            instance._loaded_feed_ids = (instance.author_id,
+                                         instance.category_id)
+        return instance
+
+    def compute_visibility(self) -> bool:
+        return bool(
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+
+    def save(self, *args, **kwargs):
+        self.is_visible = self.compute_visibility()
+        self.refresh_image_variants()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "text" in update_fields:
+            self.refresh_rendered_text()
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields, "is_visible", "image_variants"}
+            if "text" in update_fields:
+                kwargs["update_fields"] |= {"excerpt", "text_html"}
+        super().save(*args, **kwargs)
+        self._remember_saved_feeds(update_fields)
+
+    def _remember_saved_feeds(self, update_fields):
+        """
+        Ленты поста в базе после save(): следующий save() сравнивает
+        с ними, а не с лентами на момент загрузки (см. from_db).
+        """
+        if update_fields is None:
+            self._loaded_feed_ids = (self.author_id, self.category_id)
+            return
+        loaded = getattr(self, "_loaded_feed_ids", None)
+        if loaded is None:
+            return
+        author_id, category_id = loaded
+        if {"author", "author_id"} & set(update_fields):
+            author_id = self.author_id
+        if {"category", "category_id"} & set(update_fields):
+            category_id = self.category_id
+        self._loaded_feed_ids = (author_id, category_id)
+
+    def refresh_rendered_text(self):
+        """Пересчитывает анонс и HTML из текста (см. blog.rendering)."""
+        self.excerpt = rendering.make_excerpt(self.text)
+        self.text_html = rendering.make_html(self.text)
+
+    def refresh_image_variants(self):
+        """Перестраивает варианты, если изображение сменилось."""
+        source = self.image.name if self.image else ""
+        if self.image_variants.get("source", "") == source:
+            return
+        old_variants = self.image_variants
+        self.image_variants = {}
+        if self.image:
+            if not self.image._committed:
+                self.image.save(self.image.name, self.image.file, save=False)
+            try:
+                self.image_variants = images.build_variants(self.image)
+            except (OSError, ValueError):
+                # Битый файл не должен ломать сохранение поста:
+                # шаблоны покажут оригинал.
+                self.image_variants = {"source": self.image.name}
+        images.delete_variants(old_variants)
+
 
 class Comment(PublicationTimestamps):
     """Комментарии к постам."""
@@ -121,6 +314,19 @@ class Comment(PublicationTimestamps):
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)
         default_related_name = "comments"
+        indexes = (
+            models.Index(fields=("post", "created_at"),
+                         name="comment_post_created_idx"),
+        )
 
     def __str__(self) -> str:
         return self.text[:COMMENT_PREVIEW]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Пост при загрузке — чтобы при переносе комментария (админка)
+        # поправить счётчики обоих постов без лишнего запроса.
+        if "post_id" in instance.__dict__:
+            instance._loaded_post_id = instance.post_id
+        return instance
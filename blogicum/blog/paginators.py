@@ -0,0 +1,245 @@
+import base64
+import binascii
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import cache
+
+
+class InvalidCursor(Exception):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(values, direction="next"):
+    """Упаковка значений ключа в непрозрачный токен для URL."""
+    payload = json.dumps(
+        [direction, [_dump_value(value) for value in values]],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Распаковка токена обратно в направление и значения ключа."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(token)
+    if direction not in ("next", "prev") or not isinstance(values, list):
+        raise InvalidCursor(token)
+    return direction, values
+
+
+def _dump_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class CursorPage:
+    """
+    Страница курсорной пагинации.
+    Повторяет ту часть интерфейса Page, которой пользуются шаблоны.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу (keyset): вместо LIMIT/OFFSET страница
+    выбирается условием «строго после/до последней показанной строки»,
+    поэтому стоимость запроса не зависит от глубины страницы.
+    """
+
+    def __init__(self, queryset, per_page, fields=("pub_date", "id"),
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = fields
+        self.descending = descending
+
+    def page(self, cursor=None):
+        direction, values = "next", None
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            if len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            values = [self._load_value(field, value)
+                      for field, value in zip(self.fields, values)]
+        backwards = direction == "prev"
+        queryset = self.queryset.order_by(*self._ordering(backwards))
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else values is not None
+        return CursorPage(
+            rows,
+            next_cursor=(self._cursor_for(rows[-1], "next")
+                         if has_next else None),
+            previous_cursor=(self._cursor_for(rows[0], "prev")
+                             if has_previous else None),
+        )
+
+    def _ordering(self, backwards):
+        descending = self.descending != backwards
+        prefix = "-" if descending else ""
+        return [prefix + field for field in self.fields]
+
+    def _after(self, values, backwards):
+        """Условие «после» кортежа values в порядке выдачи."""
+        lookup = "lt" if self.descending != backwards else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f"{field}__{lookup}": values[index]})
+            for prev_field, prev_value in zip(self.fields[:index],
+                                              values[:index]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def _cursor_for(self, obj, direction):
+        return encode_cursor(
+            [getattr(obj, field) for field in self.fields], direction)
+
+    def _load_value(self, field, value):
+        """Значение ключа из курсора; непригодное для поля — InvalidCursor."""
+        model_field = self.queryset.model._meta.get_field(field)
+        try:
+            if model_field.get_internal_type() == "DateTimeField":
+                parsed = (parse_datetime(value) if isinstance(value, str)
+                          else None)
+                if parsed is None:
+                    raise InvalidCursor(value)
+                return parsed
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise InvalidCursor(value)
+            value = model_field.to_python(value)
+            model_field.run_validators(value)
+        except (ValueError, ValidationError):
+            raise InvalidCursor(value)
+        return value
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который не считает COUNT(*) на каждый запрос.
+
+    Число объектов кэшируется под ключом count_key вместе с версиями
+    тегов count_tags (и общего тега лент): изменение поста сбрасывает
+    счётчик его лент. Если же в ленте не меньше
+    BLOG_COUNT_ESTIMATE_THRESHOLD постов, сброшенный счётчик ещё
+    BLOG_COUNT_ESTIMATE_TTL секунд считается оценкой (count_is_estimate):
+    на глубоких лентах пара новых постов почти не меняет число страниц.
+    За пределами оценки номер страницы проверяется по точному COUNT(*),
+    как и пустая страница внутри неё: оценка завышена после удалений.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_key=None,
+                 count_tags=()):
+        super().__init__(object_list, per_page, orphans=orphans,
+                         allow_empty_first_page=allow_empty_first_page)
+        self.count_key = count_key
+        self.count_tags = [cache.FEEDS_TAG, *count_tags]
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if self.count_key is None or cache.get_count_timeout() <= 0:
+            return self.object_list.count()
+        key = cache.COUNT_KEY_PREFIX + self.count_key
+        versions = cache.get_tag_versions(self.count_tags)
+        entry = cache.get_cache().get(key)
+        if entry is not None:
+            if entry["tags"] == versions:
+                cache.count_cache_stats.hit()
+                return entry["count"]
+            if self._usable_as_estimate(entry):
+                cache.count_cache_stats.hit()
+                self.count_is_estimate = True
+                return entry["count"]
+        cache.count_cache_stats.miss()
+        return self._store_exact_count(key, versions)
+
+    def validate_number(self, number):
+        num_pages = self.num_pages  # заодно выясняется, оценка ли count
+        if self.count_is_estimate:
+            try:
+                beyond = int(number) > num_pages
+            except (TypeError, ValueError):
+                beyond = False
+            if beyond:
+                self._drop_estimate()
+        return super().validate_number(number)
+
+    def page(self, number):
+        page = super().page(number)
+        # len() выполняет выборку страницы; вьюха получит её готовой.
+        if self.count_is_estimate and page.number > 1 and not len(page):
+            self._drop_estimate()
+            return super().page(number)
+        return page
+
+    def _usable_as_estimate(self, entry):
+        threshold = cache.get_count_estimate_threshold()
+        return (
+            threshold is not None
+            and entry["count"] >= threshold
+            and time.time() - entry["stored"] < cache.get_count_estimate_ttl()
+        )
+
+    def _store_exact_count(self, key, versions):
+        count = self.object_list.count()
+        # Время записи нужно для оценки: запись пережила сброс тегов
+        # не дольше BLOG_COUNT_ESTIMATE_TTL.
+        cache.get_cache().set(
+            key,
+            {"count": count, "tags": versions, "stored": time.time()},
+            timeout=cache.get_count_timeout(),
+        )
+        return count
+
+    def _drop_estimate(self):
+        self.count_is_estimate = False
+        self.__dict__["count"] = self._store_exact_count(
+            cache.COUNT_KEY_PREFIX + self.count_key,
+            cache.get_tag_versions(self.count_tags))
+        self.__dict__.pop("num_pages", None)
@@ -0,0 +1,24 @@
+"""
+Готовые к выводу формы текста поста.
+
+Ленты показывали {{ post.text|truncatewords:10 }}, а страница поста —
+{{ post.text|linebreaksbr }}: на каждый запрос тянулся и заново
+обрабатывался весь текст. Теперь обе формы считаются при сохранении
+и хранятся в Post.excerpt и Post.text_html.
+"""
+from django.template.defaultfilters import linebreaksbr, truncatewords
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 256
+
+
+def make_excerpt(text) -> str:
+    """Анонс как у truncatewords:10, не длиннее поля Post.excerpt."""
+    excerpt = truncatewords(text, EXCERPT_WORDS)
+    return Truncator(excerpt).chars(EXCERPT_MAX_LENGTH)
+
+
+def make_html(text) -> str:
+    """Экранированный текст с <br> вместо переносов строк."""
+    return str(linebreaksbr(text, autoescape=True))
@@ -0,0 +1,59 @@
+"""
+Полнотекстовый поиск по постам на SQLite FTS5.
+
+Виртуальная таблица blog_post_fts хранит только индекс по title и text
+(external content: сами тексты берутся из blog_post); триггеры миграции
+0014 обновляют индекс при вставке, изменении и удалении поста.
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = "blog_post_fts"
+MAX_TERMS = 16
+
+# Вес совпадения в заголовке выше, чем в тексте. Меньше — релевантнее.
+RANK_SQL = f"bm25({FTS_TABLE}, 10.0, 1.0)"
+
+# Маркеры подсветки — управляющие символы, которых нет в тексте поста:
+# сниппет сначала экранируется, затем маркеры заменяются на <mark>.
+MATCH_START, MATCH_END = "\x02", "\x03"
+SNIPPET_SQL = (
+    f"snippet({FTS_TABLE}, -1, '{MATCH_START}', '{MATCH_END}', '…', 24)"
+)
+
+
+def fts_query(text) -> str:
+    """
+    Выражение MATCH из пользовательского запроса: слова в кавычках
+    (синтаксис FTS5 в запросе не интерпретируется), последнее — как
+    префикс, чтобы искать по мере набора. Пустая строка — искать нечего.
+    """
+    terms = re.findall(r"\w+", text or "")[:MAX_TERMS]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight(snippet):
+    """HTML сниппета: текст экранирован, совпадения обёрнуты в <mark>."""
+    return mark_safe(
+        escape(snippet or "")
+        .replace(MATCH_START, "<mark>")
+        .replace(MATCH_END, "</mark>")
+    )
+
+
+def matching_ids_sql():
+    return f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+
+
+def rebuild_index():
+    """Полная перестройка индекса по текущему содержимому blog_post."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
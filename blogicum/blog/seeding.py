@@ -0,0 +1,185 @@
+"""
+Синтетические данные для нагрузочных прогонов и проверки масштаба.
+
+Строки вставляются пачками через bulk_create, минуя save() и сигналы,
+поэтому денормализованные поля (is_visible, comment_count, excerpt) заполняются
+здесь же, а кэш лент сбрасывается в конце. В памяти держатся только
+идентификаторы (array), так что миллионы строк не требуют гигабайтов.
+"""
+import random
+from array import array
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, rendering
+from .models import Category, Comment, Location, Post, User
+
+WORDS = (
+    "блог путешествие город море горы лес река утро вечер дорога поезд "
+    "книга кофе музей парк мост озеро север юг история фото заметка "
+    "погода осень зима весна лето друзья ужин рецепт прогулка"
+).split()
+
+PAST_MINUTES = 3 * 365 * 24 * 60
+FUTURE_MINUTES = 30 * 24 * 60
+
+
+@dataclass
+class Skew:
+    """
+    Перекосы распределения. hot_authors — доля «горячих» авторов,
+    которым достаётся hot_author_share постов; так же для постов
+    и комментариев. Остальные доли — от постов и категорий.
+    """
+
+    hot_authors: float = 0.0
+    hot_author_share: float = 0.0
+    hot_posts: float = 0.0
+    hot_post_share: float = 0.0
+    future_posts: float = 0.0
+    unpublished_posts: float = 0.0
+    unpublished_categories: float = 0.0
+
+
+def sentence(rng, words=8):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+class Texts:
+    """
+    Заранее собранные фразы: склеивать текст из готовых заметно
+    быстрее, чем выбирать каждое слово для миллиона постов.
+    """
+
+    def __init__(self, rng, size=1000):
+        self.rng = rng
+        self.titles = [sentence(rng, 4) for _ in range(size)]
+        self.paragraphs = [sentence(rng, 30) for _ in range(size)]
+        self.comments = [sentence(rng, 12) for _ in range(size)]
+
+    def title(self):
+        return self.rng.choice(self.titles)
+
+    def text(self, paragraphs=3):
+        return "\n\n".join(self.rng.choices(self.paragraphs, k=paragraphs))
+
+    def comment(self):
+        return self.rng.choice(self.comments)
+
+
+def pick(rng, ids, hot_fraction, hot_share):
+    """Случайный id; первые hot_fraction от ids выбираются чаще."""
+    hot = int(len(ids) * hot_fraction)
+    if hot and rng.random() < hot_share:
+        return ids[rng.randrange(hot)]
+    return ids[rng.randrange(len(ids))]
+
+
+def batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+
+def next_run(seed) -> str:
+    """
+    Метка прогона в именах пользователей и slug категорий. Зависит только
+    от seed и числа прежних прогонов с ним: на чистой базе данные
+    воспроизводятся целиком, а повторный прогон не нарушает уникальность.
+    """
+    generation = 0
+    while (
+        User.objects.filter(
+            username__startswith=f"seed_{seed}-{generation}_").exists()
+        or Category.objects.filter(
+            slug__startswith=f"seed-{seed}-{generation}-").exists()
+    ):
+        generation += 1
+    return f"{seed}-{generation}"
+
+
+def seed_dataset(users=20, categories=5, locations=5, posts=500,
+                 comments=2000, seed=0, batch_size=1000, skew=None,
+                 progress=None):
+    """
+    Создаёт пользователей, категории, локации, посты и комментарии.
+    progress(модель, создано, всего) вызывается после каждой пачки.
+    Возвращает словарь с числом созданных объектов по моделям.
+    """
+    rng = random.Random(seed)
+    texts = Texts(rng)
+    skew = skew or Skew()
+    run = next_run(seed)
+    now = timezone.now()
+    password = make_password(None)
+    progress = progress or (lambda model, done, total: None)
+
+    def insert(model, total, build):
+        ids, done = array("q"), 0
+        for size in batches(total, batch_size):
+            with transaction.atomic():
+                objs = model.objects.bulk_create(
+                    [build(done + i) for i in range(size)])
+            ids.extend(obj.pk for obj in objs)
+            done += size
+            progress(model.__name__, done, total)
+        return ids
+
+    user_ids = insert(User, users, lambda i: User(
+        username=f"seed_{run}_{i}", password=password))
+    unpublished = set(rng.sample(
+        range(categories), int(categories * skew.unpublished_categories)))
+    category_ids = insert(Category, categories, lambda i: Category(
+        title=sentence(rng, 2), description=sentence(rng),
+        slug=f"seed-{run}-{i}", is_published=i not in unpublished))
+    hidden_categories = {category_ids[i] for i in unpublished}
+    location_ids = insert(Location, locations, lambda i: Location(
+        name=sentence(rng, 2)))
+
+    def build_post(i):
+        if rng.random() < skew.future_posts:
+            pub_date = now + timedelta(minutes=rng.randrange(1,
+                                                             FUTURE_MINUTES))
+        else:
+            pub_date = now - timedelta(minutes=rng.randrange(1, PAST_MINUTES))
+        category_id = category_ids[rng.randrange(len(category_ids))]
+        is_published = rng.random() >= skew.unpublished_posts
+        text = texts.text()
+        return Post(
+            title=texts.title(),
+            text=text,
+            excerpt=rendering.make_excerpt(text),
+            text_html=rendering.make_html(text),
+            pub_date=pub_date,
+            author_id=pick(rng, user_ids, skew.hot_authors,
+                           skew.hot_author_share),
+            category_id=category_id,
+            location_id=(location_ids[rng.randrange(len(location_ids))]
+                         if location_ids else None),
+            is_published=is_published,
+            is_visible=(is_published and pub_date <= now
+                        and category_id not in hidden_categories),
+        )
+
+    post_ids = insert(Post, posts if user_ids and category_ids else 0,
+                      build_post)
+    comment_ids = insert(Comment, comments if post_ids else 0,
+                         lambda i: Comment(
+                             text=texts.comment(),
+                             post_id=pick(rng, post_ids, skew.hot_posts,
+                                          skew.hot_post_share),
+                             author_id=user_ids[rng.randrange(len(user_ids))],
+                         ))
+    if comment_ids:
+        Post.objects.filter(pk__gte=min(post_ids)).rebuild_comment_counts()
+    cache.bump_tags(cache.FEEDS_TAG)
+    return {
+        "users": len(user_ids),
+        "categories": len(category_ids),
+        "locations": len(location_ids),
+        "posts": len(post_ids),
+        "comments": len(comment_ids),
+    }
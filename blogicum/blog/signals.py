@@ -0,0 +1,168 @@
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import UpdateTimestamp
+
+from . import cache, metrics
+from .models import Category, Comment, Location, Post, User
+
+
+@receiver(pre_save)
+def fill_raw_updated_at(sender, instance, raw=False, **kwargs):
+    """
+    Строки фикстур loaddata сохраняет как есть, минуя auto_now: без
+    updated_at (db.json) он берётся из created_at или текущего времени.
+    """
+    if raw and isinstance(instance, UpdateTimestamp) and (
+            instance.updated_at is None):
+        instance.updated_at = (getattr(instance, "created_at", None)
+                               or timezone.now())
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    """Запоминаем пост, к которому комментарий относился до сохранения."""
+    if raw or instance.pk is None:
+        return
+    old_post_id = getattr(instance, "_loaded_post_id", None)
+    if old_post_id is None:
+        old_post_id = Comment.objects.filter(pk=instance.pk).values_list(
+            "post_id", flat=True).first()
+    instance._old_post_id = old_post_id
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """
+    Новый комментарий увеличивает счётчик у поста; любое изменение
+    комментария сдвигает updated_at поста для условных GET-запросов.
+    Перенесённый к другому посту комментарий переходит и в его счётчик.
+    Комментарии из фикстур (raw) пересчитывают счётчик поста целиком.
+    """
+    if raw:
+        # Фикстура могла и добавить, и перезаписать комментарий.
+        Post.objects.filter(pk=instance.post_id).rebuild_comment_counts()
+        return
+    now = timezone.now()
+    changes = {"updated_at": now}
+    old_post_id = getattr(instance, "_old_post_id", None)
+    moved = old_post_id is not None and old_post_id != instance.post_id
+    if created or moved:
+        changes["comment_count"] = F("comment_count") + 1
+    if moved:
+        Post.objects.filter(pk=old_post_id, comment_count__gt=0).update(
+            comment_count=F("comment_count") - 1, updated_at=now)
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Удаление комментария — из вьюхи, админки или каскадом
+    от пользователя/поста — уменьшает счётчик у поста.
+    """
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F("comment_count") - 1,
+             updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Посты удаляемой категории остаются без неё и пропадают из лент."""
+    instance.posts.filter(is_visible=True).update(
+        is_visible=False, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def refresh_raw_post(sender, instance, raw=False, **kwargs):
+    """
+    Пост из фикстуры сохраняется без Post.save(): видимость, анонс,
+    HTML текста и число уже загруженных комментариев считаются здесь.
+    """
+    if not raw:
+        return
+    posts = Post.objects.filter(pk=instance.pk)
+    instance.refresh_rendered_text()
+    posts.update(excerpt=instance.excerpt, text_html=instance.text_html)
+    posts.refresh_visibility()
+    posts.rebuild_comment_counts()
+
+
+@receiver(post_save, sender=Category)
+def refresh_raw_category_posts(sender, instance, raw=False, **kwargs):
+    """Категория из фикстуры: то же, что делает Category.save()."""
+    if raw:
+        instance.posts.refresh_visibility()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw=False, **kwargs):
+    """Запоминаем ленты, где пост был до сохранения (автор/категория)."""
+    if raw or instance.pk is None:
+        return
+    loaded = getattr(instance, "_loaded_feed_ids", None)
+    if loaded is not None:
+        old = dict(zip(("author_id", "category_id"), loaded))
+    else:
+        old = Post.objects.filter(pk=instance.pk).values(
+            "author_id", "category_id").first()
+    if old:
+        instance._old_feed_tags = cache.feed_tags(Post(pk=instance.pk, **old))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    cache.bump_tags(
+        f"post:{instance.pk}",
+        *cache.feed_tags(instance),
+        *getattr(instance, "_old_feed_tags", ()),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    # Сигналы выше меняют у поста (и прежнего поста) comment_count
+    # и updated_at.
+    post_ids = {instance.post_id, getattr(instance, "_old_post_id", None)}
+    cache.bump_tags(*(f"post:{pk}" for pk in post_ids if pk is not None))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    cache.bump_tags(
+        f"category:{instance.pk}",
+        f"feed:category:{instance.pk}",
+        cache.FEEDS_TAG,
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    cache.bump_tags(f"location:{instance.pk}")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, instance, update_fields=None, **kwargs):
+    """Вход пользователя обновляет только last_login — страницы не меняются."""
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    cache.bump_tags(f"user:{instance.pk}")
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rate = (metrics.posts_created if sender is Post
+                else metrics.comments_created)
+        rate.record()
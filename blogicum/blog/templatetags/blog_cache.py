@@ -0,0 +1,41 @@
+from django import template
+
+from blog import cache
+
+register = template.Library()
+
+
+class PostCardCacheNode(template.Node):
+    def __init__(self, nodelist, post):
+        self.nodelist = nodelist
+        self.post = post
+
+    def render(self, context):
+        timeout = cache.get_fragment_timeout()
+        if timeout <= 0:
+            return self.nodelist.render(context)
+        post = self.post.resolve(context)
+        key = cache.post_card_key(post)
+        fragment = cache.get_cache().get(key)
+        if fragment is not None:
+            cache.fragment_cache_stats.hit()
+            return fragment
+        cache.fragment_cache_stats.miss()
+        fragment = self.nodelist.render(context)
+        cache.get_cache().set(key, fragment, timeout)
+        return fragment
+
+
+@register.tag("cache_post_card")
+def do_cache_post_card(parser, token):
+    """
+    Кэширование карточки поста:
+    {% cache_post_card post %} ... {% endcache_post_card %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает ровно один аргумент — пост.")
+    nodelist = parser.parse(("endcache_post_card",))
+    parser.delete_first_token()
+    return PostCardCacheNode(nodelist, parser.compile_filter(bits[1]))
@@ -0,0 +1,27 @@
+from django import template
+
+from blog import images
+
+register = template.Library()
+
+# Ширина карточки поста в шаблонах — 40rem.
+DEFAULT_SIZES = "(max-width: 40rem) 100vw, 40rem"
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, lazy=True, sizes=DEFAULT_SIZES):
+    """
+    Изображение поста с srcset по уменьшенным копиям
+    и явными размерами, чтобы страница не прыгала при загрузке.
+    """
+    variants = post.image_variants or {}
+    return {
+        "src": (images.largest_variant_url(variants, "jpeg")
+                or post.image.url),
+        "jpeg_srcset": images.srcset(variants, "jpeg"),
+        "webp_srcset": images.srcset(variants, "webp"),
+        "width": variants.get("width"),
+        "height": variants.get("height"),
+        "sizes": sizes,
+        "lazy": lazy,
+    }
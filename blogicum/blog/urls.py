@@ -8,6 +8,9 @@ posts_urls = [
     path("<int:pk>/",
          views.PostDetailView.as_view(),
          name="post_detail"),
+    path("<int:pk>/comments/",
+         views.PostCommentsView.as_view(),
+         name="post_comments"),
     path("create/",
          views.PostCreateView.as_view(),
          name="create_post"),
@@ -41,6 +44,9 @@ urlpatterns = [
     path("", views.IndexHome.as_view(), name="index"),
     path("posts/", include(posts_urls)),
     path("profile/", include(profile_urls)),
+    path("search/", views.PostSearchView.as_view(), name="search"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
+    path("export/<str:kind>/", views.ExportView.as_view(), name="export"),
     path(
         "category/<slug:category_slug>/",
         views.CategoryListView.as_view(),
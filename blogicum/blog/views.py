@@ -1,52 +1,76 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from django.utils import timezone
-from django.views.generic import (CreateView, DeleteView,
-                                  DetailView, ListView, UpdateView)
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from django.views.generic import (CreateView, DeleteView, DetailView,
+                                  ListView, TemplateView, UpdateView, View)
 
+from . import cache, export, lookups, metrics, search
 from .forms import CommentForm, PostForm, UserForm
-from .mixins import CommentChangeMixin, CustomListMixin, PostChangeMixin
-from .models import Category, Comment, Post, User
+from .mixins import (AnonymousPageCacheMixin, CommentChangeMixin,
+                     ConditionalGetMixin, CustomListMixin, PostChangeMixin,
+                     VisiblePostMixin)
+from .models import Comment, Post, User
 
 
-class IndexHome(CustomListMixin, ListView):
-    """Главная страница блога: опубликованные посты с прошедшей датой."""
+class IndexHome(AnonymousPageCacheMixin, ConditionalGetMixin,
+                CustomListMixin, ListView):
+    """Главная страница блога: посты, видимые в лентах."""
 
     template_name = "blog/index.html"
+    page_cache_coalesce = True
+
+    def get_page_cache_tags(self, context):
+        return ["feed:index", *super().get_page_cache_tags(context)]
+
+    def get_count_cache_key(self):
+        return "index"
+
+    def get_count_cache_tags(self):
+        return ["feed:index"]
 
     def get_queryset(self):
         return (
             super()
             .get_queryset()
-            .filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now(),
-            )
+            .filter(is_visible=True)
         )
 
 
-class CategoryListView(CustomListMixin, ListView):
+class CategoryListView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                       CustomListMixin, ListView):
     """Лента постов внутри конкретной категории."""
 
     template_name = "blog/category.html"
+    page_cache_coalesce = True
+
+    @cached_property
+    def category(self):
+        return lookups.get_published_category(self.kwargs["category_slug"])
+
+    def get_page_cache_tags(self, context):
+        return [
+            f"feed:category:{self.category.pk}",
+            f"category:{self.category.pk}",
+            *super().get_page_cache_tags(context),
+        ]
+
+    def get_count_cache_key(self):
+        return f"category:{self.category.pk}"
+
+    def get_count_cache_tags(self):
+        return [f"feed:category:{self.category.pk}"]
 
     def get_queryset(self):
-        self.category = get_object_or_404(
-            Category,
-            slug=self.kwargs["category_slug"],
-            is_published=True,
-        )
         return (
             super()
             .get_queryset()
-            .filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now(),
-                category__slug=self.kwargs["category_slug"],
-            )
+            .filter(is_visible=True, category=self.category)
         )
 
     def get_context_data(self, **kwargs):
@@ -55,23 +79,66 @@ class CategoryListView(CustomListMixin, ListView):
         return context
 
 
-class ProfileView(CustomListMixin, ListView):
+class PostSearchView(CustomListMixin, ListView):
+    """Полнотекстовый поиск по видимым в лентах постам (?q=)."""
+
+    template_name = "blog/search.html"
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def use_cursor_pagination(self):
+        # Выдача упорядочена по релевантности, а не по (pub_date, id).
+        return False
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .filter(is_visible=True)
+            .search(self.query)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        context["page_query"] = "&" + urlencode({"q": self.query})
+        for post in context["page_obj"]:
+            post.search_highlight = search.highlight(post.search_snippet)
+        return context
+
+
+class ProfileView(ConditionalGetMixin, CustomListMixin, ListView):
     """Страница профиля пользователя."""
 
     template_name = "blog/profile.html"
 
+    @cached_property
+    def author(self):
+        return lookups.get_user(self.kwargs["username"])
+
     def get_queryset(self):
-        self.author = get_object_or_404(User,
-                                        username=self.kwargs["username"])
         base_qs = super().get_queryset().filter(author=self.author)
         if self.author != self.request.user:
-            return base_qs.filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now(),
-            )
+            return base_qs.filter(is_visible=True)
         return base_qs
 
+    def get_count_cache_key(self):
+        # Автор видит в профиле и скрытые посты — у него свой счётчик.
+        scope = "all" if self.author == self.request.user else "visible"
+        return f"author:{self.author.pk}:{scope}"
+
+    def get_count_cache_tags(self):
+        return [f"feed:author:{self.author.pk}"]
+
+    def get_page_cache_tags(self, context):
+        return [
+            f"feed:author:{self.author.pk}",
+            f"user:{self.author.pk}",
+            *super().get_page_cache_tags(context),
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["profile"] = self.author
@@ -130,7 +197,8 @@ class PostDeleteView(LoginRequiredMixin, PostChangeMixin, DeleteView):
         return reverse("blog:profile", kwargs={"username": self.request.user})
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                     VisiblePostMixin, DetailView):
     """
     Страница отдельной публикации.
     Свой пост доступен всегда; чужой — только если опубликован и не отложен.
@@ -141,24 +209,42 @@ class PostDetailView(DetailView):
     pk_url_kwarg = "pk"
 
     def get_object(self, queryset=None):
-        base_qs = self.model.objects.select_related(
-            "location", "category", "author")
-        obj = super().get_object(queryset=base_qs)
-        if obj.author != self.request.user:
-            obj = get_object_or_404(
-                base_qs.filter(
-                    pub_date__lte=timezone.now(),
-                    category__is_published=True,
-                    is_published=True,
-                ),
-                pk=self.kwargs["pk"],
-            )
-        return obj
+        return self.get_visible_post(self.kwargs["pk"])
+
+    def get_last_modified(self, context):
+        # Комментарии сдвигают updated_at поста (см. blog.signals).
+        return max(
+            related.updated_at
+            for related in (self.object, self.object.category,
+                            self.object.location)
+            if related is not None
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("author")
+        context.update(self.get_comments_context(self.object))
+        return context
+
+    def get_page_cache_tags(self, context):
+        return [
+            *cache.post_tags(self.object),
+            *(f"user:{comment.author_id}" for comment in context["comments"]),
+        ]
+
+
+class PostCommentsView(VisiblePostMixin, TemplateView):
+    """Следующая порция комментариев поста для подгрузки на странице."""
+
+    template_name = "includes/comments.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        post = self.get_visible_post(self.kwargs["pk"])
+        context["post"] = post
+        context["is_fragment"] = True
+        context.update(
+            self.get_comments_context(post, self.request.GET.get("cursor")))
         return context
 
 
@@ -194,3 +280,59 @@ class CommentDeleteView(LoginRequiredMixin, CommentChangeMixin, DeleteView):
         # Удаляем form из контекста, если она вдруг появилась
         context.pop("form", None)
         return context
+
+
+class MetricsView(View):
+    """
+    Метрики для Prometheus. Доступны персоналу и по заголовку
+    Authorization: Bearer <BLOG_METRICS_TOKEN>; пока токен не задан —
+    с адресов BLOG_METRICS_ALLOWED_IPS.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request):
+        if not self.has_access(request):
+            raise Http404
+        return HttpResponse(metrics.render(), content_type=self.content_type)
+
+    @staticmethod
+    def has_access(request):
+        token = getattr(settings, "BLOG_METRICS_TOKEN", None)
+        if token:
+            scheme, _, given = request.headers.get(
+                "Authorization", "").partition(" ")
+            if scheme.lower() == "bearer" and hmac.compare_digest(
+                    given.encode(), token.encode()):
+                return True
+        allowed = getattr(settings, "BLOG_METRICS_ALLOWED_IPS", None)
+        if not token and (
+                allowed is None or request.META.get("REMOTE_ADDR") in allowed):
+            return True
+        return request.user.is_staff
+
+
+class ExportView(UserPassesTestMixin, View):
+    """
+    Потоковая выгрузка постов или комментариев для персонала:
+    /export/posts/?format=csv&author=<username>&category=<slug>.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, kind):
+        fmt = request.GET.get("format", "ndjson")
+        if kind not in export.EXPORTS or fmt not in export.FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export.render(
+                kind, fmt,
+                author=request.GET.get("author"),
+                category=request.GET.get("category"),
+            ),
+            content_type=export.FORMATS[fmt],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{kind}.{fmt}"')
+        return response
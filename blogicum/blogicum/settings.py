@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from core.db import sqlite_database
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
@@ -27,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,11 +68,10 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
+# SQLite в режиме WAL с BEGIN IMMEDIATE и постоянными подключениями
+# (см. core/db.py).
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3'),
 }
 
 
@@ -110,3 +112,69 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 LOGIN_REDIRECT_URL = 'blog:index'
 MEDIA_ROOT = BASE_DIR / 'media'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Курсорная пагинация лент вместо LIMIT/OFFSET (?cursor= вместо ?page=)
+BLOG_CURSOR_PAGINATION = False
+
+# Кэш: общий — в памяти процесса. Страницы, версии тегов, счётчики
+# и объекты для вьюх должны быть общими для всех воркеров, иначе другие
+# процессы не увидят ни собранных страниц, ни смены версий: для одного
+# хоста — файловый бэкенд, для нескольких — Redis/Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Кэш страниц лент и постов для анонимных посетителей (секунды; 0 — выкл.)
+BLOG_PAGE_CACHE_ALIAS = 'pages'
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+# Сколько секунд после устаревания страница горячей ленты ещё отдаётся,
+# пока один воркер собирает новую (0 — не отдавать устаревшее).
+BLOG_PAGE_CACHE_STALE_TIMEOUT = 60 * 5
+# Сколько секунд ждать воркер, собирающий отсутствующую страницу
+# (None — без ограничения); затем страница собирается без ожидания.
+BLOG_PAGE_CACHE_LOCK_TIMEOUT = 10
+# Каталог файлов блокировок, общий для процессов хоста
+# (None — подкаталог системного временного каталога).
+BLOG_PAGE_CACHE_LOCK_DIR = None
+# Сколько секунд запросы страницы, ответ которой не кэшируется (404,
+# неизвестная ?page=), собираются без блокировки (0 — всегда ждут её).
+BLOG_PAGE_CACHE_UNCACHEABLE_TIMEOUT = 60
+# Сколько секунд помнить версии тегов отданных страниц для ответов 304
+# на If-None-Match/If-Modified-Since (0 — без ETag и условных GET).
+BLOG_VALIDATORS_CACHE_TIMEOUT = 60 * 60
+# Кэш карточек постов в лентах (секунды; 0 — выкл.)
+BLOG_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+# Кэш числа постов в лентах для пагинатора (секунды; 0 — выкл.)
+BLOG_COUNT_CACHE_TIMEOUT = 60 * 60
+# С этого числа постов сброшенный счётчик ещё BLOG_COUNT_ESTIMATE_TTL
+# секунд служит оценкой вместо нового COUNT(*) (None — всегда точно).
+BLOG_COUNT_ESTIMATE_THRESHOLD = 10000
+BLOG_COUNT_ESTIMATE_TTL = 60
+
+# Двухуровневый кэш категорий, пользователей и постов для вьюх: LRU
+# в памяти процесса (записей на вид объектов, секунды жизни) перед общим
+# кэшем (секунды; 0 — выкл.). Изменения из других процессов замечаются
+# не позже BLOG_LOOKUP_VERSION_CHECK секунд.
+BLOG_LOOKUP_LOCAL_SIZE = 1024
+BLOG_LOOKUP_LOCAL_TIMEOUT = 30
+BLOG_LOOKUP_CACHE_TIMEOUT = 60 * 10
+BLOG_LOOKUP_VERSION_CHECK = 1
+
+# Заголовок Server-Timing с временем ответа, SQL и шаблона
+# (гистограммы по именам URL собираются в любом случае).
+SERVER_TIMING_HEADER = True
+
+# Адреса, с которых доступен /metrics (None — с любых). За прокси на том
+# же хосте все запросы приходят с 127.0.0.1 — там нужен токен: с ним
+# /metrics отдаётся только по Authorization: Bearer <токен> и персоналу.
+BLOG_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+BLOG_METRICS_TOKEN = None
@@ -0,0 +1,69 @@
+"""
+Боевой профиль: DJANGO_SETTINGS_MODULE=blogicum.settings_production.
+
+Всё берётся из blogicum/settings.py, кроме отладочного: DEBUG выключен,
+debug_toolbar не подключается, шаблоны компилируются один раз на процесс
+(кэширующий загрузчик), статика раздаётся из collectstatic с хешами
+в именах файлов (ManifestStaticFilesStorage).
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar.')
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        # С явным списком loaders APP_DIRS указывать нельзя.
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'static')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        # ManifestStaticFilesStorage без переписывания sourceMappingURL.
+        'BACKEND': 'core.storage.ManifestStaticFilesStorage',
+    },
+}
+
+# Тайминги запросов в ответах посетителям не показываем; гистограммы
+# для /metrics собираются по-прежнему.
+SERVER_TIMING_HEADER = False
+
+# За обратным прокси REMOTE_ADDR у всех один: /metrics открыт только
+# по токену из окружения и персоналу.
+BLOG_METRICS_ALLOWED_IPS = []
+BLOG_METRICS_TOKEN = os.environ.get('BLOG_METRICS_TOKEN')
@@ -4,7 +4,6 @@ from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
-import debug_toolbar
 
 
 urlpatterns = [
@@ -24,10 +23,14 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
+    # В боевом профиле (blogicum.settings_production) debug_toolbar
+    # не установлен и не импортируется.
+    if "debug_toolbar" in settings.INSTALLED_APPS:
+        import debug_toolbar
 
-    urlpatterns += (
-        path("__debug__/", include(debug_toolbar.urls)),
-    )
+        urlpatterns += (
+            path("__debug__/", include(debug_toolbar.urls)),
+        )
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
 
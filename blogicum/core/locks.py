@@ -0,0 +1,134 @@
+"""
+Блокировки по ключу между потоками и процессами одного хоста.
+
+У каждого занятого ключа свой threading.Lock и свой файл в каталоге
+блокировок (имя — хеш ключа), который захватывается через fcntl.flock:
+разные ключи никогда не ждут друг друга. Владелец удаляет файл перед
+освобождением, поэтому каталог не разрастается; захвативший уже
+удалённый файл замечает это и повторяет попытку. Без fcntl (Windows)
+блокировка действует только между потоками.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+POLL_INTERVAL = 0.01
+
+
+class KeyLock:
+    """Взаимное исключение по строковому ключу."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(
+            directory or Path(tempfile.gettempdir()) / 'blogicum-locks')
+        self._guard = threading.Lock()
+        # Хеш ключа -> [threading.Lock, сколько потоков его ждёт/держит].
+        self._thread_locks = {}
+
+    @staticmethod
+    def digest(key) -> str:
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    @contextmanager
+    def acquire(self, key, blocking=True, timeout=None):
+        """
+        Контекст, отдающий True, если блокировка взята, и False, если нет
+        (blocking=False и ключ занят, либо истёк timeout секунд).
+        """
+        digest = self.digest(key)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        thread_lock = self._checkout(digest)
+        try:
+            wait = _remaining(deadline) if blocking else -1
+            if not thread_lock.acquire(blocking, wait):
+                yield False
+                return
+            try:
+                with self._file_lock(digest, blocking, deadline) as acquired:
+                    yield acquired
+            finally:
+                thread_lock.release()
+        finally:
+            self._checkin(digest)
+
+    def _checkout(self, digest):
+        with self._guard:
+            entry = self._thread_locks.setdefault(
+                digest, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def _checkin(self, digest):
+        with self._guard:
+            entry = self._thread_locks[digest]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._thread_locks[digest]
+
+    @contextmanager
+    def _file_lock(self, digest, blocking, deadline):
+        if fcntl is None:
+            yield True
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{digest}.lock'
+        fd = _open_locked(path, blocking, deadline)
+        if fd is None:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            path.unlink(missing_ok=True)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+def _remaining(deadline):
+    if deadline is None:
+        return -1
+    return max(0.0, deadline - time.monotonic())
+
+
+def _open_locked(path, blocking, deadline):
+    """
+    Дескриптор захваченного файла path либо None, если не дождались.
+    Файл, удалённый прежним владельцем, пока мы ждали, не годится:
+    новый ждущий создаст и захватит уже другой файл.
+    """
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if not _flock(fd, blocking, deadline):
+            os.close(fd)
+            return None
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            current = None
+        if current is not None and os.path.samestat(os.fstat(fd), current):
+            return fd
+        os.close(fd)
+
+
+def _flock(fd, blocking, deadline) -> bool:
+    if blocking and deadline is None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return True
+    # flock не умеет ждать с таймаутом — опрашиваем без блокировки.
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if not blocking or time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
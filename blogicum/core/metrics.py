@@ -0,0 +1,157 @@
+"""Агрегаты метрик в памяти процесса."""
+import bisect
+import math
+import threading
+import time
+from collections import defaultdict
+
+# Границы корзин (секунды) — как у клиентов Prometheus по умолчанию.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, потокобезопасная."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """Накопительные счётчики по корзинам (le), число и сумма значений."""
+        with self._lock:
+            counts, total_sum = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for bound, count in zip((*self.buckets, float('inf')), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'count': running, 'sum': total_sum}
+
+
+class EventRate:
+    """
+    Счётчик событий: всего с запуска процесса и за последние 60 секунд
+    (кольцо посекундных ячеек — запись и чтение за O(1)/O(60)).
+    """
+
+    WINDOW = 60
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots = [0] * self.WINDOW
+        self._stamps = [None] * self.WINDOW
+        self.total = 0
+
+    def record(self, count=1):
+        second = int(self._clock())
+        index = second % self.WINDOW
+        with self._lock:
+            if self._stamps[index] != second:
+                self._stamps[index] = second
+                self._slots[index] = 0
+            self._slots[index] += count
+            self.total += count
+
+    def last_minute(self) -> int:
+        now = int(self._clock())
+        with self._lock:
+            return sum(
+                count for count, stamp in zip(self._slots, self._stamps)
+                if stamp is not None and now - stamp < self.WINDOW
+            )
+
+
+class RequestMetrics:
+    """Время ответа, SQL и шаблонов по именам URL (blog:index, ...)."""
+
+    SQL_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(self._new_view)
+
+    def _new_view(self):
+        return {
+            'duration': Histogram(),
+            'sql_time': Histogram(),
+            'sql_queries': Histogram(self.SQL_QUERY_BUCKETS),
+            'template_time': Histogram(),
+        }
+
+    def observe(self, view_name, duration, sql_time, sql_queries,
+                template_time=None):
+        with self._lock:
+            histograms = self._views[view_name]
+        histograms['duration'].observe(duration)
+        histograms['sql_time'].observe(sql_time)
+        histograms['sql_queries'].observe(sql_queries)
+        if template_time is not None:
+            histograms['template_time'].observe(template_time)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            views = dict(self._views)
+        return {
+            view_name: {name: histogram.snapshot()
+                        for name, histogram in histograms.items()}
+            for view_name, histograms in views.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+def format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+         .replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def exposition(name, metric_type, help_text, samples) -> str:
+    """
+    Одна метрика в текстовом формате Prometheus. samples — пары
+    (суффикс и метки, значение): (('', {'view': 'blog:index'}), 1.0).
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for (suffix, labels), value in samples:
+        lines.append(
+            f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def histogram_samples(snapshot, labels) -> list:
+    """Сэмплы _bucket/_sum/_count для снимка Histogram.snapshot()."""
+    samples = [
+        (('_bucket', {**labels, 'le': format_value(float(bound))}), count)
+        for bound, count in snapshot['buckets']
+    ]
+    samples.append((('_sum', labels), snapshot['sum']))
+    samples.append((('_count', labels), snapshot['count']))
+    return samples
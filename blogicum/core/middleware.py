@@ -0,0 +1,92 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import request_metrics
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class ServerTimingMiddleware:
+    """
+    Время ответа, число и время SQL-запросов, время рендера шаблона.
+
+    Значения уходят в заголовок Server-Timing (виден во вкладке Network
+    браузера) и в гистограммы core.metrics.request_metrics по имени URL.
+    Ставится первым в MIDDLEWARE, чтобы учитывать работу остальных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = {'sql_time': 0.0, 'sql_queries': 0, 'template_time': None}
+        request._server_timing = timing
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timing['sql_time'] += time.perf_counter() - started
+                timing['sql_queries'] += 1
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        request_metrics.observe(
+            match.view_name if match else UNRESOLVED_VIEW,
+            duration,
+            timing['sql_time'],
+            timing['sql_queries'],
+            timing['template_time'],
+        )
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = self.header(duration, timing)
+        return response
+
+    def process_template_response(self, request, response):
+        # Рендер начинается сразу после этого хука и заканчивается
+        # post-render колбэками. Отрендеренный во вьюхе ответ уже учтён
+        # в render_timed().
+        if response.is_rendered:
+            return response
+        timing = request._server_timing
+        started = time.perf_counter()
+
+        def rendered(response):
+            timing['template_time'] = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def header(duration, timing) -> str:
+        sql_time = timing['sql_time'] * 1000
+        metrics = [
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={sql_time:.1f};desc="{timing["sql_queries"]} queries"',
+        ]
+        if timing['template_time'] is not None:
+            metrics.append(f'tpl;dur={timing["template_time"] * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+def render_timed(request, response):
+    """
+    Рендер TemplateResponse прямо во вьюхе (например, под блокировкой)
+    с учётом его времени в Server-Timing и гистограммах шаблонов.
+    """
+    started = time.perf_counter()
+    response.render()
+    timing = getattr(request, '_server_timing', None)
+    if timing is not None:
+        timing['template_time'] = time.perf_counter() - started
+    return response
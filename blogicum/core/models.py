@@ -18,6 +18,18 @@ class PublicationTimestamps(models.Model):
         abstract = True
 
 
+class UpdateTimestamp(models.Model):
+    """Абстрактная модель с временем последнего изменения."""
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+
+    class Meta:
+        abstract = True
+
+
 class BaseTitle(models.Model):
     """Базовая модель с заголовком."""
 
@@ -0,0 +1,65 @@
+"""
+Бюджет SQL-запросов: контекстный менеджер и декоратор.
+
+    with QueryBudget(5):
+        client.get('/')
+
+    @QueryBudget(3)
+    def build_feed(): ...
+
+При превышении бросает QueryBudgetExceeded со списком запросов.
+Считает через connection.execute_wrapper, поэтому работает и при
+DEBUG=False, и в потоках с собственным подключением.
+"""
+from contextlib import ContextDecorator, ExitStack
+
+from django.db import connections
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Выполнено больше SQL-запросов, чем разрешено бюджетом."""
+
+
+class QueryBudget(ContextDecorator):
+    """Не больше max_queries запросов к базе using (по умолчанию — ко всем)."""
+
+    def __init__(self, max_queries, using=None, label=''):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label
+        self.queries = []
+
+    def __enter__(self):
+        self.queries = []
+        self._stack = ExitStack()
+        aliases = [self.using] if self.using else list(connections)
+        for alias in aliases:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stack.close()
+        if exc_type is None and len(self.queries) > self.max_queries:
+            raise QueryBudgetExceeded(self.report())
+        return False
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def report(self) -> str:
+        label = f'{self.label}: ' if self.label else ''
+        lines = [
+            f'{label}{self.count} SQL-запросов при бюджете '
+            f'{self.max_queries}:'
+        ]
+        lines.extend(
+            f'{number}. {sql}'
+            for number, sql in enumerate(self.queries, start=1)
+        )
+        return '\n'.join(lines)
@@ -0,0 +1,24 @@
+"""Хранилище статики для боевого профиля."""
+from django.contrib.staticfiles import storage
+
+
+def _without_source_maps(patterns):
+    return tuple(
+        (extension, tuple(
+            pattern for pattern in extension_patterns
+            if 'sourceMappingURL' not in (
+                pattern[0] if isinstance(pattern, tuple) else pattern)
+        ))
+        for extension, extension_patterns in patterns
+    )
+
+
+class ManifestStaticFilesStorage(storage.ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который не переписывает ссылки
+    sourceMappingURL: минифицированный bootstrap ссылается на .map,
+    которого в static_dev нет, и collectstatic падал бы на нём.
+    """
+
+    patterns = _without_source_maps(
+        storage.ManifestStaticFilesStorage.patterns)
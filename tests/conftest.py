@@ -41,6 +41,35 @@ def enable_debug_false():
         yield
 
 
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests-default",
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests-pages",
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Тесты работают с кэшами в памяти: файловый кэш страниц из настроек
+    (BASE_DIR/cache) общий с запущенным сервером разработчика.
+    """
+    from django.core.cache import caches
+
+    from blog import lookups
+
+    with override_settings(CACHES=TEST_CACHES):
+        yield
+        for cache in caches.all():
+            cache.clear()
+    lookups.clear_local()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +392,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,69 @@
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from django.db.models import Count
+from django.test import override_settings
+
+from blog import cache
+from blog.management.commands.bench_wsgi import (ROUTES, Command, Dataset,
+                                                 compare, percentile,
+                                                 run_worker)
+from blog.models import Post
+from blog.seeding import seed_dataset
+from blogicum import settings as project_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seed_dataset_fills_denormalized_fields():
+    created = seed_dataset(users=3, categories=2, locations=1, posts=20,
+                           comments=50)
+    assert created["posts"] == 20 and created["comments"] == 50
+    posts = Post.objects.annotate(real_count=Count("comments"))
+    assert all(post.comment_count == post.real_count for post in posts), (
+        "Убедитесь, что seed_dataset заполняет Post.comment_count."
+    )
+    assert Post.objects.filter(is_visible=True).count() == 20
+
+
+def test_every_route_of_the_mix_succeeds():
+    seed_dataset(users=3, categories=2, locations=1, posts=20, comments=20)
+    dataset = Dataset()
+    schedule = [route for route in ROUTES for _ in range(3)]
+    latencies, errors = run_worker(dataset, schedule, seed=1)
+    assert not errors, f"Маршруты нагрузочной смеси вернули ошибки: {errors}"
+    assert set(latencies) == set(ROUTES)
+
+
+def test_percentile_and_baseline_comparison():
+    values = sorted(random.Random(0).random() for _ in range(100))
+    assert percentile(values, 50) == values[49]
+    assert percentile(values, 99) == values[98]
+    baseline = {"rps": 100.0, "routes": {
+        "index": {"rps": 50.0, "p95_ms": 10.0}}}
+    report = {"rps": 95.0, "routes": {
+        "index": {"rps": 40.0, "p95_ms": 10.5}}}
+    regressions = compare(baseline, report, tolerance=10)
+    assert regressions == ["index: req/s 50.0 → 40.0"]
+
+
+def test_benchmark_keeps_pages_cache_and_locks_apart(tmp_path):
+    command = Command()
+    command.directory = SimpleNamespace(name=str(tmp_path))
+    pages = project_settings.CACHES[project_settings.BLOG_PAGE_CACHE_ALIAS]
+    with override_settings(CACHES=project_settings.CACHES):
+        with command.temporary_caches():
+            location = Path(cache.get_cache()._dir)
+            cache.bump_tags("post:1")
+            lock_dir = cache.page_locks.directory
+        assert location.is_relative_to(tmp_path) and any(location.iterdir())
+        assert location != Path(pages["LOCATION"]), (
+            "Убедитесь, что bench_wsgi не пишет во временную базу"
+            " общий кэш страниц сайта."
+        )
+        assert lock_dir.is_relative_to(tmp_path)
+    assert not cache.page_locks.directory.is_relative_to(tmp_path), (
+        "Убедитесь, что после прогона блокировки страниц снова общие."
+    )
@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+
+from blog import cache
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    for i in range(3):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": f"#{i}"})
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что создание комментария увеличивает"
+        " `Post.comment_count`."
+    )
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что удаление комментария уменьшает"
+        " `Post.comment_count`."
+    )
+
+
+def test_comment_count_follows_cascades(
+        mixer, post_with_published_location, another_user):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что каскадное удаление комментариев вместе с автором"
+        " уменьшает `Post.comment_count`."
+    )
+
+
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post)
+    type(post).objects.update(comment_count=0)
+    call_command("rebuild_comment_counts", verbosity=0)
+    post.refresh_from_db()
+    assert post.comment_count == 4
+
+
+def test_comment_count_follows_moved_comment(
+        mixer, post_with_published_location):
+    first = post_with_published_location
+    second = mixer.blend("blog.Post", category=first.category,
+                         is_published=True)
+    comment = Comment.objects.get(
+        pk=mixer.blend("blog.Comment", post=first).pk)
+    tags = [f"post:{first.pk}", f"post:{second.pk}"]
+    before = cache.get_tag_versions(tags)
+    comment.post = second
+    comment.save()
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.comment_count, second.comment_count) == (0, 1), (
+        "Убедитесь, что перенос комментария к другому посту меняет"
+        " счётчики обоих постов."
+    )
+    after = cache.get_tag_versions(tags)
+    assert all(after[tag] != before[tag] for tag in tags)
+    comment.post = first
+    comment.save()
+    first.refresh_from_db()
+    assert first.comment_count == 1
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.mixins import COMMENTS_PAGE_SIZE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _comment_ids(response):
+    return [comment.id for comment in response.context["comments"]]
+
+
+def test_comments_paginated_with_fragment(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    total = COMMENTS_PAGE_SIZE * 2 + 5
+    comments = mixer.cycle(total).blend("blog.Comment", post=post)
+    expected = [c.id for c in sorted(
+        comments, key=lambda c: (c.created_at, c.id))]
+
+    response = user_client.get(f"/posts/{post.id}/")
+    seen = _comment_ids(response)
+    assert len(seen) == COMMENTS_PAGE_SIZE, (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев."
+    )
+    page = response.context["comments_page"]
+    while page.has_next():
+        fragment = user_client.get(
+            f"/posts/{post.id}/comments/", {"cursor": page.next_cursor})
+        assert fragment.status_code == HTTPStatus.OK
+        assert "<form" not in fragment.content.decode("utf-8")
+        seen += _comment_ids(fragment)
+        page = fragment.context["comments_page"]
+    assert seen == expected, (
+        "Убедитесь, что порции комментариев по курсору идут подряд, без"
+        " пропусков и повторов."
+    )
+
+
+def test_detail_queries_do_not_grow_with_comments(
+        user_client, mixer, published_category, user):
+    def count_queries(n_comments):
+        post = mixer.blend("blog.Post", author=user,
+                           category=published_category)
+        mixer.cycle(n_comments).blend("blog.Comment", post=post)
+        with CaptureQueriesContext(connection) as ctx:
+            user_client.get(f"/posts/{post.id}/")
+        return len(ctx)
+
+    assert count_queries(2) == count_queries(COMMENTS_PAGE_SIZE * 3), (
+        "Убедитесь, что число запросов страницы поста не зависит от числа"
+        " комментариев."
+    )
+
+
+def test_fragment_respects_visibility(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+@pytest.mark.parametrize("client_name", ["user_client", "unlogged_client"])
+def test_not_modified_until_post_changes(
+        request, client_name, mixer, post_with_published_location):
+    client = request.getfixturevalue(client_name)
+    post = post_with_published_location
+    urls = ("/", f"/category/{post.category.slug}/",
+            f"/profile/{post.author.username}/", f"/posts/{post.id}/")
+    responses = {url: client.get(url) for url in urls}
+    for url, response in responses.items():
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        )
+        assert response.has_header("Last-Modified") == url.startswith(
+            "/posts/"), (
+            "Убедитесь, что Last-Modified отдаёт только страница поста:"
+            " дата изменения ленты не сдвигается при удалении постов."
+        )
+        assert _revalidate(client, url, response).status_code == (
+            HTTPStatus.NOT_MODIFIED), (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304."
+        )
+
+    mixer.blend("blog.Comment", post=post)
+    for url, response in responses.items():
+        assert _revalidate(client, url, response).status_code == (
+            HTTPStatus.OK), (
+            f"Убедитесь, что после нового комментария `{url}` отдаётся"
+            " заново."
+        )
+
+
+def test_if_modified_since(user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    revalidated = user_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_hidden_post_not_revalidated(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    response = another_user_client.get(url)
+    post.is_published = False
+    post.save()
+    assert _revalidate(another_user_client, url, response).status_code == (
+        HTTPStatus.NOT_FOUND), (
+        "Убедитесь, что снятый с публикации пост не подтверждается"
+        " ответом 304 для чужих пользователей."
+    )
+    assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_feed_revalidated_after_delete(
+        unlogged_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    newer = mixer.blend("blog.Post", category=post.category,
+                        location=post.location, pub_date=post.pub_date)
+    url = f"/category/{post.category.slug}/"
+    response = unlogged_client.get(url)
+    newer.delete()
+    assert _revalidate(unlogged_client, url, response).status_code == (
+        HTTPStatus.OK), (
+        "Убедитесь, что после удаления поста лента не подтверждается"
+        " ответом 304."
+    )
+
+
+def test_revalidation_without_queries(
+        unlogged_client, django_assert_num_queries,
+        post_with_published_location):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    response = unlogged_client.get(url)
+    with django_assert_num_queries(0):
+        revalidated = _revalidate(unlogged_client, url, response)
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_plain_get_skips_validators_query(
+        unlogged_client, django_assert_max_num_queries,
+        post_with_published_location):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    unlogged_client.get(url)
+    with django_assert_max_num_queries(10) as queries:
+        unlogged_client.get(url)
+    assert not any("MAX(" in query["sql"] for query in queries), (
+        "Убедитесь, что запрос без If-None-Match/If-Modified-Since"
+        " не считает валидаторы по всей ленте."
+    )
+
+
+def test_etag_changes_after_relogin(
+        user, user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    user_client.logout()
+    user_client.force_login(user)
+    assert _revalidate(user_client, url, response).status_code == (
+        HTTPStatus.OK), (
+        "Убедитесь, что после повторного входа страница с формой"
+        " собирается заново: в ней новый CSRF-токен."
+    )
+
+
+def test_etag_changes_after_username_change(
+        user, user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    user.username = f"{user.username}-renamed"
+    user.save()
+    assert _revalidate(user_client, url, response).status_code == (
+        HTTPStatus.OK), (
+        "Убедитесь, что смена имени посетителя, показанного в шапке,"
+        " меняет ETag."
+    )
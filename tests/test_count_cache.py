@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category):
+    def make(count):
+        return mixer.cycle(count).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+    return make
+
+
+def _count_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    counts = [query["sql"] for query in queries
+              if query["sql"].startswith("SELECT COUNT(*)")]
+    return response, counts
+
+
+def test_feed_count_is_cached_and_invalidated(user_client, make_posts):
+    make_posts(N_PER_PAGE + 1)
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["paginator"].count == N_PER_PAGE + 1
+    assert len(counts) == 1
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["paginator"].count == N_PER_PAGE + 1
+    assert not counts, (
+        "Убедитесь, что повторный запрос ленты берёт число постов из кэша."
+    )
+    make_posts(1)
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["paginator"].count == N_PER_PAGE + 2, (
+        "Убедитесь, что новый пост сбрасывает кэшированное число постов."
+    )
+    assert len(counts) == 1
+
+
+def test_profile_counts_are_separate_for_owner(
+        user, user_client, another_user_client, make_posts):
+    make_posts(2)
+    hidden = make_posts(1)[0]
+    hidden.is_published = False
+    hidden.save()
+    url = f"/profile/{user.username}/"
+    assert another_user_client.get(url).context["paginator"].count == 2
+    assert user_client.get(url).context["paginator"].count == 3
+
+
+@override_settings(BLOG_COUNT_ESTIMATE_THRESHOLD=N_PER_PAGE,
+                   BLOG_COUNT_ESTIMATE_TTL=60)
+def test_large_feed_count_is_estimated(user_client, make_posts):
+    make_posts(N_PER_PAGE)
+    user_client.get("/")
+    make_posts(1)
+    response, counts = _count_queries(user_client, "/")
+    paginator = response.context["paginator"]
+    assert paginator.count_is_estimate and paginator.count == N_PER_PAGE, (
+        "Убедитесь, что выше порога сброшенный счётчик служит оценкой."
+    )
+    assert not counts
+    response, counts = _count_queries(user_client, "/", page=2)
+    assert response.status_code == 200, (
+        "Убедитесь, что страница за пределами оценки проверяется"
+        " по точному числу постов."
+    )
+    assert response.context["paginator"].count == N_PER_PAGE + 1
+    assert len(response.context["page_obj"]) == 1
+
+
+@override_settings(BLOG_COUNT_ESTIMATE_THRESHOLD=N_PER_PAGE,
+                   BLOG_COUNT_ESTIMATE_TTL=60)
+def test_empty_estimated_page_checked_by_exact_count(
+        user_client, make_posts):
+    posts = make_posts(2 * N_PER_PAGE)
+    user_client.get("/")
+    for post in posts[:N_PER_PAGE]:
+        post.delete()
+    response = user_client.get("/", {"page": 2})
+    assert response.status_code == 404, (
+        "Убедитесь, что пустая страница в пределах завышенной оценки"
+        " проверяется по точному числу постов и отвечает 404."
+    )
+    response = user_client.get("/")
+    assert response.context["paginator"].count == N_PER_PAGE
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog.seeding import seed_dataset
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _content(response):
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся StreamingHttpResponse."
+    )
+    return b"".join(response.streaming_content).decode()
+
+
+def test_export_requires_staff(user_client):
+    assert user_client.get("/export/posts/").status_code == 403
+
+
+def test_export_posts_ndjson(admin_client, post_with_published_location,
+                             post_of_another_author):
+    post = post_with_published_location
+    response = admin_client.get(
+        "/export/posts/", {"author": post.author.username})
+    assert response["Content-Type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in _content(response).splitlines()]
+    assert [row["id"] for row in rows] == [post.id], (
+        "Убедитесь, что выгрузку можно отфильтровать по автору."
+    )
+    assert rows[0]["title"] == post.title
+    assert rows[0]["category__slug"] == post.category.slug
+
+
+def test_export_comments_csv_by_category(admin_client, comment_to_a_post,
+                                         post_with_another_category):
+    category = comment_to_a_post.post.category
+    response = admin_client.get(
+        "/export/comments/", {"format": "csv", "category": category.slug})
+    rows = list(csv.DictReader(io.StringIO(_content(response))))
+    assert [int(row["id"]) for row in rows] == [comment_to_a_post.id]
+    assert rows[0]["text"] == comment_to_a_post.text
+
+
+def test_export_command_streams_in_chunks(tmp_path, django_assert_num_queries):
+    seed_dataset(users=2, categories=1, posts=25, comments=0)
+    output = tmp_path / "posts.ndjson"
+    # Порции по 10 строк: 25 постов читаются одним курсором.
+    with django_assert_num_queries(1):
+        call_command("export_blog", "posts", chunk_size=10,
+                     output=str(output))
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 25
+    ids = [json.loads(line)["id"] for line in lines]
+    assert ids == sorted(ids)
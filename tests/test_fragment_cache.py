@@ -0,0 +1,35 @@
+import pytest
+
+from blog.cache import fragment_cache_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stats_delta(client, url):
+    before = fragment_cache_stats.snapshot()
+    client.get(url)
+    after = fragment_cache_stats.snapshot()
+    return (after["hits"] - before["hits"],
+            after["misses"] - before["misses"])
+
+
+def test_post_cards_cached(
+        user_client, mixer, many_posts_with_published_locations):
+    assert _stats_delta(user_client, "/") == (0, 10)
+    assert _stats_delta(user_client, "/") == (10, 0), (
+        "Убедитесь, что на прогретой ленте карточки постов берутся"
+        " из кэша фрагментов."
+    )
+    post = user_client.get("/").context["page_obj"][0]
+    mixer.blend("blog.Comment", post=post)
+    assert _stats_delta(user_client, "/") == (9, 1), (
+        "Убедитесь, что новый комментарий сбрасывает кэш только карточки"
+        " своего поста."
+    )
+    post.category.title = "Переименованная категория"
+    post.category.save()
+    hits, misses = _stats_delta(user_client, "/")
+    assert misses == 10 and "Переименованная категория" in (
+        user_client.get("/").content.decode("utf-8")), (
+        "Убедитесь, что изменение категории сбрасывает кэш её карточек."
+    )
@@ -0,0 +1,84 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _image_file(size, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, format="JPEG")
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+def test_variants_built_on_upload(
+        media_root, mixer, user, published_category, user_client):
+    post = mixer.blend("blog.Post", author=user, category=published_category,
+                       image=_image_file((1200, 800)))
+    variants = post.image_variants
+    assert (variants["width"], variants["height"]) == (1200, 800)
+    built = {(v["format"], v["width"], v["height"])
+             for v in variants["variants"]}
+    assert built == {
+        (fmt, width, round(width * 800 / 1200))
+        for fmt in ("jpeg", "webp") for width in (320, 640, 960)
+    }, "Убедитесь, что для изображения строятся JPEG- и WebP-копии."
+    for variant in variants["variants"]:
+        with default_storage.open(variant["name"]) as f, Image.open(f) as im:
+            assert im.size == (variant["width"], variant["height"])
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert 'loading="lazy"' in content
+    assert 'width="1200" height="800"' in content
+    assert "960w" in content and 'type="image/webp"' in content, (
+        "Убедитесь, что карточка поста выводит srcset по вариантам"
+        " изображения."
+    )
+
+
+def test_small_image_not_upscaled(media_root, mixer, published_category):
+    post = mixer.blend("blog.Post", category=published_category,
+                       image=_image_file((100, 60)))
+    assert {v["width"] for v in post.image_variants["variants"]} == {100}
+
+
+def test_variants_replaced_with_image(media_root, mixer, published_category):
+    post = mixer.blend("blog.Post", category=published_category,
+                       image=_image_file((700, 700)))
+    old_names = [v["name"] for v in post.image_variants["variants"]]
+    post.image = _image_file((400, 400), name="other.jpg")
+    post.save()
+    assert {v["width"] for v in post.image_variants["variants"]} == {
+        320, 400}
+    assert not any(default_storage.exists(name) for name in old_names), (
+        "Убедитесь, что при замене изображения старые варианты удаляются."
+    )
+    post.image = None
+    post.save()
+    assert post.image_variants == {}
+
+
+def test_built_variants_reach_cached_pages(
+        media_root, mixer, published_category, client):
+    post = mixer.blend("blog.Post", category=published_category,
+                       image=_image_file((1200, 800)))
+    Post.objects.filter(pk=post.pk).update(image_variants={})
+    assert "960w" not in client.get("/").content.decode("utf-8")
+    call_command("build_image_variants", stdout=StringIO())
+    assert "960w" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что build_image_variants сбрасывает кэш страниц"
+        " с постами, для которых построены варианты."
+    )
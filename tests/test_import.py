@@ -0,0 +1,139 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.importer import FixtureImporter, iter_objects
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+EXCLUDE = ["admin", "sessions", "auth.permission"]
+
+
+def test_import_db_json(tmp_path):
+    call_command("import_blog", str(DB_JSON), batch_size=7,
+                 exclude=EXCLUDE, drop_indexes=True, verbosity=0)
+    fixture = json.loads(DB_JSON.read_text(encoding="utf-8"))
+    expected = {
+        model: sum(1 for obj in fixture if obj["model"] == label)
+        for model, label in ((Post, "blog.post"), (User, "auth.user"),
+                             (Category, "blog.category"),
+                             (Location, "blog.location"))
+    }
+    for model, count in expected.items():
+        assert model.objects.count() == count
+    post = Post.objects.get(pk=1)
+    assert post.is_visible == post.compute_visibility(), (
+        "Убедитесь, что после загрузки пересчитывается Post.is_visible."
+    )
+    assert Post.objects.matching(post.title.split()[0]).filter(
+        pk=post.pk).exists(), (
+        "Убедитесь, что после --drop-indexes поисковый индекс построен."
+    )
+
+
+def test_import_ndjson_with_counts_and_conflicts(tmp_path, user,
+                                                 published_category):
+    lines = [
+        {"model": "blog.post", "pk": 500, "fields": {
+            "title": "Импорт", "text": "Текст", "is_published": True,
+            "pub_date": "2020-01-01T00:00:00Z", "author": user.pk,
+            "category": published_category.pk,
+            "created_at": "2020-01-01T00:00:00Z"}},
+    ] + [
+        {"model": "blog.comment", "pk": 900 + i, "fields": {
+            "text": f"#{i}", "post": 500, "author": user.pk,
+            "created_at": "2020-01-01T00:00:00Z"}}
+        for i in range(3)
+    ]
+    path = tmp_path / "dump.jsonl"
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+    call_command("import_blog", str(path), verbosity=0)
+    post = Post.objects.get(pk=500)
+    assert post.comment_count == 3 and post.is_visible
+    assert Comment.objects.filter(post=post).count() == 3
+
+    lines[0]["fields"]["title"] = "Импорт 2"
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+    with pytest.raises(CommandError, match="UNIQUE"):
+        call_command("import_blog", str(path), verbosity=0)
+    call_command("import_blog", str(path), on_conflict="update",
+                 verbosity=0)
+    assert Post.objects.get(pk=500).title == "Импорт 2"
+
+
+def test_conflict_reports_committed_batches(tmp_path, user,
+                                            published_category):
+    fields = {"title": "Импорт", "text": "Текст", "is_published": True,
+              "pub_date": "2020-01-01T00:00:00Z", "author": user.pk,
+              "category": published_category.pk,
+              "created_at": "2020-01-01T00:00:00Z"}
+    path = tmp_path / "dump.jsonl"
+    path.write_text(json.dumps(
+        {"model": "blog.post", "pk": 700, "fields": fields}))
+    call_command("import_blog", str(path), verbosity=0)
+    path.write_text("\n".join(
+        json.dumps({"model": "blog.post", "pk": pk, "fields": fields})
+        for pk in (600, 700)))
+    with pytest.raises(CommandError, match="Уже сохранено: blog.Post: 1"):
+        call_command("import_blog", str(path), batch_size=1, verbosity=0)
+    assert Post.objects.filter(pk=600).exists()
+
+
+def test_forward_references_resolved_per_batch(tmp_path, user,
+                                               published_category):
+    lines = [
+        {"model": "blog.comment", "pk": 900 + i, "fields": {
+            "text": f"#{i}", "post": 500, "author": user.pk,
+            "created_at": "2020-01-01T00:00:00Z"}}
+        for i in range(5)
+    ] + [
+        {"model": "blog.post", "pk": 500, "fields": {
+            "title": "Импорт", "text": "Текст", "is_published": True,
+            "pub_date": "2020-01-01T00:00:00Z", "author": user.pk,
+            "category": published_category.pk,
+            "created_at": "2020-01-01T00:00:00Z"}},
+    ]
+    path = tmp_path / "dump.jsonl"
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+    pending = []
+    importer = FixtureImporter(
+        batch_size=2,
+        progress=lambda label, count, elapsed: pending.append(
+            sum(len(values) for values in importer.pending.values())))
+    with open(path, encoding="utf-8") as stream:
+        importer.load(stream)
+    assert max(pending) == 1, (
+        "Убедитесь, что для ссылок вперёд хранятся значения ключей,"
+        " а не каждая ссылающаяся строка."
+    )
+    assert pending[-1] == 0, (
+        "Убедитесь, что ссылки снимаются сразу после вставки пачки"
+        " связанной модели."
+    )
+    assert Post.objects.get(pk=500).comment_count == 5
+
+
+def test_import_reports_dangling_foreign_keys(tmp_path, user):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps([{"model": "blog.comment", "pk": 1, "fields": {
+        "text": "?", "post": 12345, "author": user.pk,
+        "created_at": "2020-01-01T00:00:00Z"}}]))
+    with pytest.raises(CommandError, match="post=12345"):
+        call_command("import_blog", str(path), verbosity=0)
+    importer = FixtureImporter(skip_missing=True)
+    with open(path, encoding="utf-8") as stream:
+        assert importer.load(stream) == {"blog.Comment": 0}
+    assert importer.skipped == {"blog.Comment": 1}
+
+
+def test_stream_parser_reads_in_small_chunks():
+    objects = [{"model": "blog.location", "pk": i,
+                "fields": {"name": "Место " * i}} for i in range(1, 50)]
+    text = json.dumps(objects, indent=2, ensure_ascii=False)
+    parsed = list(iter_objects(io.StringIO(text), read_size=16))
+    assert parsed == objects
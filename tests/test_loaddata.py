@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Category, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+def test_loaddata_db_json():
+    call_command("loaddata", str(DB_JSON), verbosity=0)
+    assert Post.objects.count() == 39
+    for model in (Category, Location, Post):
+        assert not model.objects.filter(updated_at__isnull=True).exists(), (
+            "Убедитесь, что при loaddata заполняется updated_at."
+        )
+
+
+def test_loaddata_computes_denormalized_fields():
+    call_command("loaddata", str(DB_JSON), verbosity=0)
+    posts = list(Post.objects.select_related("category"))
+    assert any(post.is_visible for post in posts)
+    for post in posts:
+        assert post.is_visible == post.compute_visibility(), (
+            "Убедитесь, что после loaddata у постов посчитан is_visible."
+        )
+        assert post.excerpt and post.text_html
+
+
+def test_loaddata_counts_comments(tmp_path, user,
+                                  post_with_published_location):
+    post = post_with_published_location
+    path = tmp_path / "comments.json"
+    path.write_text(json.dumps([
+        {"model": "blog.comment", "pk": 100 + i, "fields": {
+            "text": f"#{i}", "post": post.pk, "author": user.pk,
+            "created_at": "2020-01-01T00:00:00Z"}}
+        for i in range(3)
+    ]))
+    call_command("loaddata", str(path), verbosity=0)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что комментарии из фикстуры учитываются в"
+        " `Post.comment_count`."
+    )
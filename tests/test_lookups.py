@@ -0,0 +1,179 @@
+import timeit
+
+import pytest
+from django.test import override_settings
+
+from blog import cache, lookups
+from blog.lookups import TwoTierCache
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+
+def _tier():
+    return TwoTierCache("test", lambda value: ["test"])
+
+
+def _stats():
+    return (lookups.local_stats.snapshot(), lookups.shared_stats.snapshot())
+
+
+def test_local_tier_serves_repeated_lookups():
+    tier, load = _tier(), CountingLoader()
+    assert tier.get("a", load) == {"value": 1}
+    local_before, shared_before = _stats()
+    assert tier.get("a", load) == {"value": 1}
+    local_after, shared_after = _stats()
+    assert load.calls == 1
+    assert local_after["hits"] == local_before["hits"] + 1
+    assert shared_after == shared_before, (
+        "Убедитесь, что попадание в LRU процесса не обращается к общему кэшу."
+    )
+
+
+def test_shared_tier_serves_other_processes():
+    tier, load = _tier(), CountingLoader()
+    tier.get("a", load)
+    other_process = _tier()
+    assert other_process.get("a", load) == {"value": 1}
+    assert load.calls == 1, (
+        "Убедитесь, что второй уровень (кэш Django) общий для процессов."
+    )
+
+
+@override_settings(BLOG_LOOKUP_LOCAL_SIZE=2)
+def test_local_tier_is_bounded_lru():
+    tier, load = _tier(), CountingLoader()
+    for key in ("a", "b", "a", "c"):
+        tier.get(key, load)
+    assert list(tier._entries) == ["a", "c"], (
+        "Убедитесь, что LRU вытесняет давно не запрошенные записи."
+    )
+
+
+@override_settings(BLOG_LOOKUP_LOCAL_TIMEOUT=0)
+def test_local_entries_expire():
+    tier, load = _tier(), CountingLoader()
+    tier.get("a", load)
+    local_before, _ = _stats()
+    tier.get("a", load)
+    local_after, _ = _stats()
+    assert local_after["misses"] == local_before["misses"] + 1
+    assert load.calls == 1
+
+
+def test_version_bump_invalidates_both_tiers():
+    tier, load = _tier(), CountingLoader()
+    tier.get("a", load)
+    cache.bump_tags("test")
+    assert tier.get("a", load) == {"value": 2}
+
+
+@override_settings(BLOG_LOOKUP_VERSION_CHECK=60)
+def test_bump_from_another_process_seen_after_version_check():
+    tier, load = _tier(), CountingLoader()
+    tier.get("a", load)
+    # Другой процесс меняет версию только в общем кэше.
+    cache.get_cache().set(cache.TAG_KEY_PREFIX + "test", "other")
+    assert tier.get("a", load) == {"value": 1}
+    with override_settings(BLOG_LOOKUP_VERSION_CHECK=0):
+        assert tier.get("a", load) == {"value": 2}, (
+            "Убедитесь, что версия сверяется с общим кэшем по истечении"
+            " BLOG_LOOKUP_VERSION_CHECK."
+        )
+
+
+def test_unrelated_bump_keeps_entries():
+    tier = TwoTierCache("test", lambda value: [f"test:{value['key']}"])
+    calls = []
+
+    def loader(key):
+        return lambda: calls.append(key) or {"key": key}
+
+    tier.get("a", loader("a"))
+    tier.get("b", loader("b"))
+    cache.bump_tags("test:a")
+    tier.get("a", loader("a"))
+    tier.get("b", loader("b"))
+    assert calls == ["a", "b", "a"], (
+        "Убедитесь, что изменение одного объекта не сбрасывает кэш"
+        " остальных объектов того же вида."
+    )
+
+
+def test_returned_objects_do_not_share_related_state():
+    tier = _tier()
+    first = tier.get("a", lambda: {"author": {"name": "автор"}})
+    first["author"]["name"] = "изменено во вьюхе"
+    assert tier.get("a", CountingLoader())["author"]["name"] == "автор", (
+        "Убедитесь, что изменения связанных объектов во вьюхе не попадают"
+        " в кэш."
+    )
+
+
+@pytest.mark.django_db
+def test_local_hit_is_cheaper_than_shared_hit(
+        tmp_path, post_with_published_location):
+    pk = post_with_published_location.pk
+
+    def hit():
+        lookups.get_post(pk)
+
+    # Общий уровень — файловый кэш, как в настройках по умолчанию.
+    shared_cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tmp_path,
+    }
+    with override_settings(CACHES={"default": shared_cache},
+                           BLOG_PAGE_CACHE_ALIAS="default",
+                           BLOG_LOOKUP_VERSION_CHECK=60):
+        hit()
+        lookups.clear_local()
+        with override_settings(BLOG_LOOKUP_LOCAL_SIZE=0):
+            shared = min(timeit.repeat(hit, number=50, repeat=5))
+        hit()
+        local = min(timeit.repeat(hit, number=50, repeat=5))
+        lookups.clear_local()
+    assert local < shared, (
+        "Убедитесь, что попадание в LRU процесса дешевле попадания"
+        " в общий кэш."
+    )
+
+
+@pytest.mark.django_db
+def test_views_use_cached_lookups(
+        user_client, post_with_published_location, published_category):
+    post = post_with_published_location
+    urls = (f"/category/{published_category.slug}/",
+            f"/profile/{post.author.username}/", f"/posts/{post.id}/")
+    for url in urls:
+        user_client.get(url)
+    local_before, _ = _stats()
+    for url in urls:
+        assert user_client.get(url).status_code == 200
+    local_after, _ = _stats()
+    assert local_after["hits"] - local_before["hits"] == len(urls)
+
+    published_category.title = "Категория после правки"
+    published_category.save()
+    content = user_client.get(urls[0]).content.decode()
+    assert published_category.title in content, (
+        "Убедитесь, что изменение категории сбрасывает её кэш."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(urls[0]).status_code == 404
+
+
+def test_metrics_report_hit_ratio_per_tier():
+    from blog import metrics
+
+    text = metrics.render()
+    for tier in ("lookup_local", "lookup_shared"):
+        assert f'blog_cache_hit_ratio{{cache="{tier}"}}' in text
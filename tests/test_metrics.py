@@ -0,0 +1,73 @@
+import re
+
+import pytest
+from django.test import override_settings
+
+from blog import metrics
+from core.metrics import EventRate, request_metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _sample(text, line_start):
+    match = re.search(
+        rf"^{re.escape(line_start)} (\S+)$", text, flags=re.MULTILINE)
+    assert match, f"В выводе /metrics нет строки `{line_start}`."
+    return float(match.group(1))
+
+
+def test_metrics_exposition(client, user_client, published_category):
+    request_metrics.reset()
+    client.get("/")
+    before = metrics.posts_created.total
+    user_client.post("/posts/create/", {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date": "2020-01-01T10:00", "category": published_category.id,
+    })
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = response.content.decode()
+    assert "# TYPE blog_request_duration_seconds histogram" in text
+    assert _sample(
+        text,
+        'blog_request_duration_seconds_bucket{view="blog:index",le="+Inf"}',
+    ) == 1
+    assert _sample(
+        text, 'blog_request_db_queries_count{view="blog:index"}') == 1
+    assert _sample(text, 'blog_cache_hit_ratio{cache="page"}') >= 0
+    assert _sample(text, "blog_posts_created_total") == before + 1
+    assert _sample(text, "blog_posts_created_last_minute") >= 1
+
+
+@override_settings(BLOG_METRICS_ALLOWED_IPS=["10.0.0.1"])
+def test_metrics_hidden_from_other_addresses(client):
+    assert client.get("/metrics").status_code == 404
+
+
+@override_settings(BLOG_METRICS_TOKEN="secret")
+def test_metrics_token_required_when_configured(client, mixer):
+    assert client.get("/metrics").status_code == 404, (
+        "Убедитесь, что с заданным BLOG_METRICS_TOKEN адрес 127.0.0.1"
+        " (например, прокси на том же хосте) не открывает /metrics."
+    )
+    assert client.get(
+        "/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 404
+    assert client.get(
+        "/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code == 200
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    assert client.get("/metrics").status_code == 200
+
+
+def test_event_rate_window():
+    now = [1000.0]
+    rate = EventRate(clock=lambda: now[0])
+    rate.record()
+    now[0] += 30
+    rate.record(2)
+    assert rate.last_minute() == 3
+    now[0] += 45
+    assert rate.last_minute() == 2, (
+        "Убедитесь, что события старше минуты не учитываются."
+    )
+    assert rate.total == 3
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import cache
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _selects_from(queries, table):
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith("SELECT")
+        and f'FROM "{table}"' in query["sql"]
+    ]
+
+
+@pytest.mark.parametrize("suffix", ["edit/", "delete/"])
+def test_post_ownership_loads_post_once(
+        user_client, post_with_published_location, suffix):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(f"/posts/{post.id}/{suffix}")
+    assert response.status_code == 200
+    assert len(_selects_from(ctx.captured_queries, "blog_post")) == 1, (
+        "Убедитесь, что при проверке авторства пост загружается из базы"
+        " один раз."
+    )
+    assert len(_selects_from(ctx.captured_queries, "auth_user")) == 1, (
+        "Убедитесь, что для проверки авторства не загружается автор поста:"
+        " достаточно сравнить `author_id`."
+    )
+
+
+@pytest.mark.parametrize(
+    "method, suffix, data, expected",
+    [
+        ("get", "edit_comment", None, 3),
+        ("post", "edit_comment", {"text": "Новый текст"}, 5),
+        ("get", "delete_comment", None, 3),
+        ("post", "delete_comment", {}, 5),
+    ],
+)
+def test_comment_ownership_query_budget(
+        mixer, user, user_client, post_with_published_location,
+        django_assert_num_queries, method, suffix, data, expected):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/posts/{post.id}/{suffix}/{comment.id}/"
+    # Сессия, пользователь, комментарий и, для POST, запись с пересчётом поста.
+    with django_assert_num_queries(expected):
+        getattr(user_client, method)(url, data or {})
+
+
+def test_post_delete_query_budget(
+        user_client, post_with_published_location, comment_to_a_post,
+        django_assert_num_queries):
+    post = post_with_published_location
+    with django_assert_num_queries(7):
+        response = user_client.post(f"/posts/{post.id}/delete/")
+    assert response.status_code == 302
+
+
+def test_foreign_object_redirects_without_extra_queries(
+        another_user_client, post_with_published_location,
+        django_assert_num_queries):
+    post = post_with_published_location
+    with django_assert_num_queries(3):
+        response = another_user_client.get(f"/posts/{post.id}/edit/")
+    assert response.status_code == 302
+
+
+def test_repeated_save_invalidates_previous_feed(
+        mixer, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    second, third = mixer.cycle(2).blend("blog.Category", is_published=True)
+    post.category = second
+    post.save()
+    tag = f"feed:category:{second.pk}"
+    before = cache.get_tag_versions([tag])
+    post.category = third
+    post.save()
+    assert cache.get_tag_versions([tag]) != before, (
+        "Убедитесь, что второй save() сбрасывает ленту категории,"
+        " сохранённой первым, а не загруженной из базы."
+    )
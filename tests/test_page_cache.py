@@ -0,0 +1,64 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_served_from_cache(
+        client, django_assert_num_queries, post_with_published_location,
+        published_category):
+    post = post_with_published_location
+    for url in ("/", f"/category/{published_category.slug}/",
+                f"/posts/{post.id}/"):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша."
+        )
+
+
+def test_cache_invalidated_by_models(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    urls = ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/")
+    for url in urls:
+        client.get(url)
+
+    post.title = "Новый заголовок поста"
+    post.save()
+    for url in urls:
+        assert post.title in client.get(url).content.decode("utf-8"), (
+            f"Убедитесь, что изменение поста сбрасывает кэш `{url}`."
+        )
+
+    post.category.title = "Новое имя категории"
+    post.category.save()
+    for url in urls:
+        assert post.category.title in client.get(url).content.decode(
+            "utf-8"), (
+            f"Убедитесь, что изменение категории сбрасывает кэш `{url}`."
+        )
+
+    post.location.name = "Новое место"
+    post.location.save()
+    for url in urls:
+        assert post.location.name in client.get(url).content.decode(
+            "utf-8"), (
+            f"Убедитесь, что изменение локации сбрасывает кэш `{url}`."
+        )
+
+    comment = mixer.blend("blog.Comment", post=post, text="Свежий коммент")
+    assert comment.text in client.get(f"/posts/{post.id}/").content.decode(
+        "utf-8"), "Убедитесь, что новый комментарий сбрасывает кэш поста."
+    assert "Комментарии (1)" in client.get("/").content.decode("utf-8")
+
+
+def test_authenticated_pages_not_cached(
+        client, user_client, user, post_with_published_location):
+    client.get("/")
+    content = user_client.get("/").content.decode("utf-8")
+    assert user.username in content and "Выйти" in content, (
+        "Убедитесь, что залогиненный пользователь не получает страницу"
+        " из кэша анонимных посетителей."
+    )
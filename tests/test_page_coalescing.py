@@ -0,0 +1,243 @@
+import multiprocessing
+import os
+import re
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.filebased import FileBasedCache
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory, override_settings
+from django.utils.module_loading import import_string
+from django.views import View
+
+from blog import cache
+from blog.mixins import AnonymousPageCacheMixin
+from blogicum import settings as project_settings
+from conftest import TEST_CACHES
+from core.locks import KeyLock
+
+
+def _hold_in_child(directory, key, locked, release):
+    lock = KeyLock(directory)
+    with lock.acquire(key):
+        locked.set()
+        release.wait(5)
+
+
+def test_key_lock_excludes_threads_and_processes(tmp_path):
+    lock = KeyLock(tmp_path)
+    holder = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with lock.acquire("page"):
+            holder.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holder.wait(5)
+    with lock.acquire("page", blocking=False) as acquired:
+        assert not acquired, "Ключ, занятый другим потоком, не выдаётся."
+    with lock.acquire("page", timeout=0.05) as acquired:
+        assert not acquired
+    release.set()
+    thread.join()
+
+    context = multiprocessing.get_context("fork")
+    locked, release = context.Event(), context.Event()
+    child = context.Process(target=_hold_in_child,
+                            args=(tmp_path, "page", locked, release))
+    child.start()
+    try:
+        assert locked.wait(5)
+        with lock.acquire("page", blocking=False) as acquired:
+            assert not acquired, (
+                "Убедитесь, что блокировка действует между процессами."
+            )
+    finally:
+        release.set()
+        child.join(5)
+    with lock.acquire("page", blocking=False) as acquired:
+        assert acquired
+
+
+def test_key_lock_is_per_key(tmp_path):
+    lock = KeyLock(tmp_path)
+    with lock.acquire("page:1"):
+        with lock.acquire("page:2", blocking=False) as acquired:
+            assert acquired, (
+                "Убедитесь, что занятый ключ не блокирует другие ключи."
+            )
+    assert not list(tmp_path.iterdir()), (
+        "Убедитесь, что освобождённые блокировки не оставляют файлов."
+    )
+
+
+class SlowPageView(AnonymousPageCacheMixin, View):
+    page_cache_coalesce = True
+    renders = None
+
+    def get(self, request):
+        time.sleep(0.3)
+        self.renders.put(os.getpid())
+        return SimpleTemplateResponse(
+            engines["django"].from_string("page from {{ pid }}"),
+            {"pid": os.getpid()},
+        )
+
+    def get_page_cache_tags(self, context):
+        return []
+
+
+def _request_in_child(renders, contents):
+    request = RequestFactory().get("/slow/")
+    request.user = AnonymousUser()
+    response = SlowPageView.as_view(renders=renders)(request)
+    if hasattr(response, "render"):
+        response.render()
+    contents.put(response.content)
+
+
+def test_page_built_once_by_processes_sharing_cache(tmp_path):
+    pages = project_settings.CACHES[project_settings.BLOG_PAGE_CACHE_ALIAS]
+    assert import_string(pages["BACKEND"]) is FileBasedCache, (
+        "Убедитесь, что кэш страниц по умолчанию общий для процессов."
+    )
+    # Тесты работают с кэшами в памяти — процессам нужен общий файловый.
+    shared = {**TEST_CACHES, "pages": {**pages, "LOCATION": tmp_path}}
+    with override_settings(CACHES=shared):
+        _build_page_in_two_processes()
+
+
+def _build_page_in_two_processes():
+    context = multiprocessing.get_context("fork")
+    renders, contents = context.Queue(), context.Queue()
+    children = [
+        context.Process(target=_request_in_child, args=(renders, contents))
+        for _ in range(2)
+    ]
+    for child in children:
+        child.start()
+    pages = [contents.get(timeout=10) for _ in children]
+    for child in children:
+        child.join(5)
+    assert renders.qsize() == 1, (
+        "Убедитесь, что отсутствующую страницу собирает один процесс,"
+        " а другой получает её из общего кэша."
+    )
+    assert pages[0] == pages[1]
+
+
+def _index_key():
+    return cache.page_key(RequestFactory().get("/"))
+
+
+@pytest.mark.django_db
+def test_stale_index_served_while_another_worker_rebuilds(
+        client, post_with_published_location):
+    post = post_with_published_location
+    client.get("/")
+    post.title = "Заголовок после правки"
+    post.save()
+    holder, release = threading.Event(), threading.Event()
+
+    def rebuild_elsewhere():
+        with cache.page_locks.acquire(_index_key()):
+            holder.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=rebuild_elsewhere)
+    thread.start()
+    holder.wait(5)
+    try:
+        stale = client.get("/").content.decode()
+    finally:
+        release.set()
+        thread.join()
+    assert post.title not in stale, (
+        "Убедитесь, что пока страницу пересобирает другой воркер,"
+        " отдаётся устаревшая копия."
+    )
+    assert post.title in client.get("/").content.decode(), (
+        "Убедитесь, что после пересборки лента показывает изменения."
+    )
+
+
+@pytest.mark.django_db
+def test_missing_index_waits_for_the_worker_that_builds_it(
+        client, django_assert_num_queries, post_with_published_location):
+    key = _index_key()
+    holder = threading.Event()
+
+    def build_elsewhere():
+        with cache.page_locks.acquire(key):
+            holder.set()
+            time.sleep(0.2)
+            cache.get_cache().set(key, {
+                "content": b"built by another worker",
+                "content_type": "text/html; charset=utf-8",
+                "status": 200,
+                "headers": {},
+                "tags": cache.get_tag_versions([cache.FEEDS_TAG]),
+                "fresh_until": time.time() + 60,
+            })
+
+    thread = threading.Thread(target=build_elsewhere)
+    thread.start()
+    holder.wait(5)
+    try:
+        with django_assert_num_queries(0):
+            response = client.get("/")
+    finally:
+        thread.join()
+    assert response.content == b"built by another worker", (
+        "Убедитесь, что при промахе воркер дожидается страницы, которую"
+        " уже собирает другой, вместо повторного запроса к базе."
+    )
+
+
+@pytest.mark.django_db
+def test_coalesced_page_reports_template_time(
+        client, post_with_published_location):
+    header = client.get("/").get("Server-Timing", "")
+    template_time = re.search(r"tpl;dur=([\d.]+)", header)
+    assert template_time and float(template_time.group(1)) > 0, (
+        "Убедитесь, что время рендера страницы, собранной под блокировкой,"
+        " попадает в Server-Timing."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGE_CACHE_LOCK_TIMEOUT=5)
+def test_uncacheable_page_does_not_wait_for_lock(
+        client, post_with_published_location):
+    url = "/?page=99"
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    holder, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with cache.page_locks.acquire(
+                cache.page_key(RequestFactory().get(url))):
+            holder.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    holder.wait(5)
+    try:
+        started = time.monotonic()
+        response = client.get(url)
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+        thread.join()
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert elapsed < 1, (
+        "Убедитесь, что запросы страниц, которые не попадают в кэш (404),"
+        " не ждут блокировку её ключа."
+    )
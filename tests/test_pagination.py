@@ -0,0 +1,119 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from blog.models import Post
+from blog.paginators import encode_cursor
+from blog.seeding import seed_dataset
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == HTTPStatus.OK
+        page = response.context["page_obj"]
+        assert page.is_cursor, (
+            "Убедитесь, что при включённой курсорной пагинации лента"
+            " листается по курсору."
+        )
+        seen.append([post.id for post in page])
+        if not page.has_next():
+            return seen
+        cursor = page.next_cursor
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(
+        user_client, many_posts_with_published_locations):
+    posts = many_posts_with_published_locations
+    pages = _walk_cursor_pages(user_client, "/")
+    flat = [post_id for page in pages for post_id in page]
+    expected = [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    ]
+    assert flat == expected, (
+        "Убедитесь, что курсорная пагинация выдаёт все публикации ровно"
+        " один раз и в порядке «от новых к старым»."
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_previous_page(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get("/").context["page_obj"]
+    second = user_client.get(
+        "/", {"cursor": first.next_cursor}).context["page_obj"]
+    back = user_client.get(
+        "/", {"cursor": second.previous_cursor}).context["page_obj"]
+    assert [post.id for post in back] == [post.id for post in first], (
+        "Убедитесь, что ссылка «назад» курсорной пагинации возвращает"
+        " на предыдущую страницу."
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert f"?cursor={first.next_cursor}" in content
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_page_numbers_still_served(
+        user_client, many_posts_with_published_locations):
+    response = user_client.get("/", {"page": 2})
+    assert response.status_code == HTTPStatus.OK
+    page = response.context["page_obj"]
+    assert page.number == 2, (
+        "Убедитесь, что ссылки вида ?page=N продолжают работать при"
+        " включённой курсорной пагинации."
+    )
+
+
+@pytest.mark.parametrize("values", [
+    ["2020-13-45T00:00:00", 1],
+    ["2020-01-01T00:00:00", "abc"],
+    ["2020-01-01T00:00:00", 2 ** 80],
+    ["2020-01-01T00:00:00", True],
+])
+def test_invalid_cursor_is_404(user_client, post_with_published_location,
+                               values):
+    response = user_client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    cursor = encode_cursor(values)
+    for url in ("/", f"/posts/{post_with_published_location.pk}/comments/"):
+        assert user_client.get(url, {"cursor": cursor}).status_code == (
+            HTTPStatus.NOT_FOUND), (
+            f"Убедитесь, что курсор {values} на `{url}` даёт 404, а не 500."
+        )
+
+
+def _paginator_html(client, page):
+    content = client.get("/", {"page": page}).content.decode()
+    start = content.index('<nav aria-label="Page navigation"')
+    return content[start:content.index("</nav>", start)]
+
+
+def test_page_range_is_elided(client):
+    seed_dataset(users=2, categories=1, locations=0, posts=200, comments=0)
+    response = client.get("/", {"page": 10})
+    assert response.context["page_range"] == [
+        1, "…", 8, 9, 10, 11, 12, "…", 20], (
+        "Убедитесь, что пагинатор показывает первую и последнюю страницы,"
+        " соседей текущей и многоточия вместо остальных номеров."
+    )
+
+
+def test_paginator_size_does_not_grow_with_page_count(client):
+    sizes = {}
+    for total in (100, 1000, 10000):
+        seed_dataset(users=2, categories=1, locations=0,
+                     posts=total - Post.objects.count(), comments=0)
+        pages = total // N_PER_PAGE
+        sizes[pages] = len(_paginator_html(client, pages // 2))
+    assert max(sizes.values()) - min(sizes.values()) < 100, (
+        "Убедитесь, что размер пагинатора не растёт вместе с числом"
+        f" страниц: {sizes}"
+    )
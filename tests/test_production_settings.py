@@ -0,0 +1,61 @@
+import importlib
+from io import StringIO
+
+from django.core.management import call_command
+
+from core.storage import ManifestStaticFilesStorage
+
+
+def load_production_settings(monkeypatch):
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "test-secret")
+    module = importlib.import_module("blogicum.settings_production")
+    return importlib.reload(module)
+
+
+def test_production_profile_drops_debug_tooling(monkeypatch):
+    production = load_production_settings(monkeypatch)
+    assert production.DEBUG is False
+    assert production.SECRET_KEY == "test-secret"
+    assert "debug_toolbar" not in production.INSTALLED_APPS
+    assert not any(middleware.startswith("debug_toolbar")
+                   for middleware in production.MIDDLEWARE), (
+        "Убедитесь, что в боевом профиле нет DebugToolbarMiddleware."
+    )
+    options = production.TEMPLATES[0]["OPTIONS"]
+    assert options["loaders"][0][0] == (
+        "django.template.loaders.cached.Loader"), (
+        "Убедитесь, что боевой профиль включает кэширующий загрузчик "
+        "шаблонов."
+    )
+    assert production.STORAGES["staticfiles"]["BACKEND"] == (
+        "core.storage.ManifestStaticFilesStorage")
+
+
+def test_production_profile_closes_metrics(monkeypatch):
+    monkeypatch.delenv("BLOG_METRICS_TOKEN", raising=False)
+    production = load_production_settings(monkeypatch)
+    assert production.BLOG_METRICS_ALLOWED_IPS == [], (
+        "Убедитесь, что за прокси /metrics не открыт по адресу 127.0.0.1."
+    )
+    assert production.BLOG_METRICS_TOKEN is None
+    monkeypatch.setenv("BLOG_METRICS_TOKEN", "scrape")
+    assert load_production_settings(monkeypatch).BLOG_METRICS_TOKEN == (
+        "scrape")
+
+
+def test_manifest_storage_skips_source_maps():
+    for _, patterns in ManifestStaticFilesStorage.patterns:
+        for pattern in patterns:
+            regex = pattern[0] if isinstance(pattern, tuple) else pattern
+            assert "sourceMappingURL" not in regex
+    css_patterns = dict(ManifestStaticFilesStorage.patterns)["*.css"]
+    assert css_patterns, "Ссылки url() в CSS должны по-прежнему хешироваться."
+
+
+def test_bench_startup_boots_both_profiles():
+    out = StringIO()
+    call_command("bench_startup", "--repeat", "1", stdout=out)
+    rows = {line.split()[0]: line.split() for line in
+            out.getvalue().splitlines()[1:3]}
+    assert set(rows) == {"development", "production"}
+    assert all(row[-1] == "200" for row in rows.values()), out.getvalue()
@@ -0,0 +1,155 @@
+"""
+Бюджеты SQL-запросов для каждого URL блога и статических страниц.
+
+Новая вьюха без строки в QUERY_BUDGETS роняет
+test_every_url_has_a_budget; число запросов не должно зависеть
+ни от числа постов на странице, ни от числа комментариев.
+"""
+import pytest
+from django.core.cache import caches
+from django.test import Client
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+
+from blog import lookups
+from blog import urls as blog_urls
+from blog.models import Comment, Post
+from blog.seeding import seed_dataset
+from core.query_budget import QueryBudget, QueryBudgetExceeded
+from pages import urls as pages_urls
+
+pytestmark = [pytest.mark.django_db]
+
+# Имя URL: (аноним, авторизованный автор). Авторизованный запрос
+# всегда читает сессию и пользователя — это два запроса из бюджета.
+# Автор поста в этих тестах — сотрудник, чтобы открывалась выгрузка.
+QUERY_BUDGETS = {
+    "blog:index": (3, 5),
+    "blog:category_posts": (4, 6),
+    "blog:profile": (4, 6),
+    "blog:post_detail": (3, 5),
+    "blog:post_comments": (2, 4),
+    "blog:search": (2, 4),
+    "blog:create_post": (0, 4),
+    "blog:edit_post": (0, 5),
+    "blog:delete_post": (0, 4),
+    "blog:add_comment": (0, 5),
+    "blog:edit_comment": (0, 3),
+    "blog:delete_comment": (0, 3),
+    "blog:edit_profile": (0, 2),
+    "blog:metrics": (0, 0),
+    "blog:export": (0, 3),
+    "pages:about": (0, 2),
+    "pages:rules": (0, 2),
+}
+POST_ROUTES = {"blog:add_comment": {"text": "Комментарий"}}
+QUERY_STRINGS = {"blog:search": "?q=блог"}
+
+
+def url_names(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}:{pattern.name}"
+
+
+@pytest.fixture
+def dataset():
+    seed_dataset(users=3, categories=2, locations=1, posts=3, comments=2,
+                 seed=1)
+    post = Post.objects.filter(is_visible=True).first()
+    post.author.is_staff = True
+    post.author.save()
+    comment = Comment.objects.create(post=post, author=post.author,
+                                     text="Комментарий автора")
+    return post, comment
+
+
+def grow(post, posts=30, comments=120):
+    """Больше постов в тех же лентах и больше комментариев к посту."""
+    now = timezone.now()
+    Post.objects.bulk_create([
+        Post(title=f"Пост {i}", text="Текст", pub_date=now,
+             author_id=post.author_id, category_id=post.category_id,
+             is_visible=True)
+        for i in range(posts)
+    ])
+    Comment.objects.bulk_create([
+        Comment(post=post, author_id=post.author_id, text=f"#{i}")
+        for i in range(comments)
+    ])
+    Post.objects.filter(pk=post.pk).rebuild_comment_counts()
+
+
+def url_for(name, post, comment):
+    args = {
+        "blog:category_posts": [post.category.slug],
+        "blog:profile": [post.author.username],
+        "blog:post_detail": [post.pk],
+        "blog:post_comments": [post.pk],
+        "blog:edit_post": [post.pk],
+        "blog:delete_post": [post.pk],
+        "blog:add_comment": [post.pk],
+        "blog:edit_comment": [post.pk, comment.pk],
+        "blog:delete_comment": [post.pk, comment.pk],
+        "blog:export": ["posts"],
+    }
+    return reverse(name, args=args.get(name, ())) + QUERY_STRINGS.get(
+        name, "")
+
+
+def measure(client, name, url, budget):
+    """Холодный запрос (без кэша страниц и карточек) в рамках бюджета."""
+    for cache in caches.all():
+        cache.clear()
+    lookups.clear_local()
+    with QueryBudget(budget, label=name) as counter:
+        if name in POST_ROUTES:
+            response = client.post(url, POST_ROUTES[name])
+        else:
+            response = client.get(url)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code < 400, f"{name}: {response.status_code}"
+    return counter.count
+
+
+def test_every_url_has_a_budget():
+    names = {*url_names(blog_urls.urlpatterns, "blog"),
+             *url_names(pages_urls.urlpatterns, "pages")}
+    missing = names - QUERY_BUDGETS.keys()
+    assert not missing, (
+        f"Добавьте бюджет SQL-запросов в QUERY_BUDGETS для: {missing}"
+    )
+
+
+@pytest.mark.parametrize("name", QUERY_BUDGETS)
+def test_query_budget_holds_and_does_not_grow(name, dataset):
+    post, comment = dataset
+    author = Client()
+    author.force_login(post.author)
+    url = url_for(name, post, comment)
+    clients = list(zip((Client(), author), QUERY_BUDGETS[name]))
+    before = [measure(client, name, url, budget)
+              for client, budget in clients]
+    grow(post)
+    after = [measure(client, name, url, budget)
+             for client, budget in clients]
+    assert before == after, (
+        f"{name}: число запросов растёт с объёмом данных "
+        f"({before} → {after})."
+    )
+
+
+def test_query_budget_reports_queries():
+    with pytest.raises(QueryBudgetExceeded, match="2 SQL-запросов"):
+        with QueryBudget(1):
+            list(Post.objects.all())
+            list(Comment.objects.all())
+
+    @QueryBudget(1)
+    def one_query():
+        return Post.objects.count()
+
+    assert one_query() == 0
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog import views
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "sqlite",
+                       reason="планы запросов проверяются на SQLite"),
+]
+
+# «SCAN t USING INDEX i» — проход по индексу в нужном порядке до LIMIT,
+# а «SCAN t» без индекса — чтение таблицы целиком.
+FULL_SCAN = re.compile(
+    r"\bSCAN (blog_\w+|auth_user)\b(?! USING (COVERING )?INDEX)")
+
+
+def _queryset(view_cls, user, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def _assert_no_full_scan(name, queryset):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f"Убедитесь, что запрос `{name}` не сканирует таблицу целиком:\n"
+        f"{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что сортировка запроса `{name}` берётся из индекса:\n"
+        f"{plan}"
+    )
+
+
+def test_feed_plans_use_indexes(user, another_user, published_category):
+    querysets = {
+        "blog:index": _queryset(views.IndexHome, AnonymousUser()),
+        "blog:category_posts": _queryset(
+            views.CategoryListView, AnonymousUser(),
+            category_slug=published_category.slug),
+        "blog:profile (автор)": _queryset(
+            views.ProfileView, user, username=user.username),
+        "blog:profile (гость)": _queryset(
+            views.ProfileView, another_user, username=user.username),
+    }
+    for name, queryset in querysets.items():
+        _assert_no_full_scan(name, queryset)
+        _assert_no_full_scan(f"{name}, страница", queryset[:10])
+
+
+def test_comment_plan_uses_index(post_with_published_location):
+    _assert_no_full_scan(
+        "комментарии поста",
+        post_with_published_location.comments.select_related("author"),
+    )
@@ -0,0 +1,56 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ("Первая <b>строка</b>\n" + "слово " * 2000).strip()
+
+
+def test_save_precomputes_excerpt_and_html(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert post.excerpt == (
+        "Первая <b>строка</b> слово слово слово слово слово слово слово "
+        "слово …"), "Убедитесь, что анонс совпадает с truncatewords:10."
+    assert post.text_html.startswith(
+        "Первая &lt;b&gt;строка&lt;/b&gt;<br>слово"), (
+        "Убедитесь, что HTML текста экранирован и переносы заменены на <br>."
+    )
+
+
+def test_feeds_do_not_load_post_bodies(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    selects = [query["sql"] for query in queries
+               if 'FROM "blog_post"' in query["sql"]]
+    assert selects and not any('"blog_post"."text"' in sql
+                               for sql in selects), (
+        "Убедитесь, что ленты не выбирают колонку text."
+    )
+    content = response.content.decode()
+    assert post.excerpt.replace("<", "&lt;").replace(">", "&gt;") in content
+    detail = client.get(f"/posts/{post.id}/").content.decode()
+    assert post.text_html in detail
+
+
+def test_rebuild_post_texts_backfills_bulk_loaded_rows(
+        post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        text="Новый\nтекст", excerpt="", text_html="")
+    call_command("rebuild_post_texts", stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.excerpt, post.text_html) == ("Новый текст",
+                                              "Новый<br>текст")
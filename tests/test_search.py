@@ -0,0 +1,83 @@
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def make(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            category=published_category, is_published=is_published,
+            pub_date=timezone.now())
+
+    return {
+        "title": make("Ёлки в Карелии", "Короткий рассказ о походе."),
+        "text": make("Поход", "Шли мимо сосен, и ёлки стояли у озера."),
+        "other": make("Рецепт", "Пирог с яблоками."),
+        "hidden": make("Ёлки под снегом", "Черновик.", is_published=False),
+    }
+
+
+def test_search_ranks_and_obeys_visibility(client, searchable_posts):
+    response = client.get("/search/", {"q": "ёлки"})
+    assert response.status_code == 200
+    found = [post.id for post in response.context["page_obj"]]
+    assert found[0] == searchable_posts["title"].id, (
+        "Убедитесь, что совпадение в заголовке ранжируется выше,"
+        " чем совпадение в тексте."
+    )
+    assert searchable_posts["text"].id in found, (
+        "Убедитесь, что поиск находит слово в тексте поста."
+    )
+    assert searchable_posts["other"].id not in found
+    assert searchable_posts["hidden"].id not in found, (
+        "Убедитесь, что поиск не показывает посты, скрытые из лент."
+    )
+
+
+def test_search_index_follows_post_changes(searchable_posts):
+    post = searchable_posts["other"]
+    assert list(Post.objects.matching("пиро")) == [post], (
+        "Убедитесь, что последнее слово запроса ищется как префикс."
+    )
+    post.text = "Штрудель с вишней."
+    post.save()
+    assert not Post.objects.matching("пирог").exists(), (
+        "Убедитесь, что индекс поиска обновляется при изменении поста."
+    )
+    assert list(Post.objects.matching("штрудель")) == [post]
+    post.delete()
+    assert not Post.objects.matching("штрудель").exists()
+
+
+def test_search_snippet_is_escaped_and_highlighted(
+        client, mixer, user, published_category):
+    mixer.blend(
+        "blog.Post", title="Заметка", author=user,
+        category=published_category, is_published=True,
+        pub_date=timezone.now(), text="<script>alert(1)</script> байдарка")
+    response = client.get("/search/", {"q": "байдарка"})
+    content = response.content.decode()
+    assert "<mark>байдарка</mark>" in content
+    assert "<script>alert(1)</script>" not in content, (
+        "Убедитесь, что сниппет экранирует текст поста."
+    )
+
+
+@pytest.mark.parametrize("query", ["", "   ", '"', "AND OR NOT", "*"])
+def test_search_accepts_any_query(client, searchable_posts, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+
+
+def test_admin_search_uses_index(admin_client, searchable_posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "пирог"})
+    assert response.status_code == 200
+    found = list(response.context["cl"].result_list)
+    assert found == [searchable_posts["other"]], (
+        "Убедитесь, что поиск в админке ищет по тексту поста."
+    )
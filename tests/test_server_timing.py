@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from core.metrics import Histogram, request_metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def reset_request_metrics():
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    response = user_client.get(
+        f"/posts/{post_with_published_location.id}/")
+    header = response.get("Server-Timing", "")
+    assert re.search(r"total;dur=[\d.]+", header), (
+        "Убедитесь, что ответ содержит заголовок Server-Timing"
+        " с общим временем обработки запроса."
+    )
+    queries = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', header)
+    assert queries and int(queries.group(1)) > 0, (
+        "Убедитесь, что в Server-Timing указаны время и число SQL-запросов."
+    )
+    assert re.search(r"tpl;dur=[\d.]+", header), (
+        "Убедитесь, что в Server-Timing указано время рендера шаблона."
+    )
+
+
+def test_metrics_are_grouped_by_url_name(client, user_client):
+    client.get("/")
+    client.get("/")
+    user_client.get("/posts/create/")
+    client.get("/no-such-page/")
+    snapshot = request_metrics.snapshot()
+    assert snapshot["blog:index"]["duration"]["count"] == 2
+    assert snapshot["blog:create_post"]["duration"]["count"] == 1
+    assert snapshot["<unresolved>"]["duration"]["count"] == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == [(1, 2), (5, 3), (float("inf"), 4)]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == 14.5
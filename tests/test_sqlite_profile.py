@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from django.db import OperationalError, transaction
+from django.db.utils import ConnectionHandler
+
+from core.db import sqlite_database
+
+pytestmark = [pytest.mark.django_db]
+
+WORKERS = 8
+WRITES_PER_WORKER = 25
+
+
+@pytest.fixture
+def stress_connections(tmp_path, monkeypatch):
+    """Отдельная файловая база с боевым профилем для потоков теста."""
+    handler = ConnectionHandler(
+        {"default": sqlite_database(tmp_path / "stress.sqlite3")})
+    monkeypatch.setattr(transaction, "connections", handler)
+    with handler["default"].cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE post (id INTEGER PRIMARY KEY,"
+            " comment_count INTEGER NOT NULL)")
+        cursor.execute(
+            "CREATE TABLE comment (id INTEGER PRIMARY KEY, text TEXT)")
+        cursor.execute("INSERT INTO post VALUES (1, 0)")
+    yield handler
+    handler.close_all()
+
+
+def test_profile_enables_wal_and_pragmas(stress_connections):
+    with stress_connections["default"].cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1, "Ожидается synchronous=NORMAL."
+    assert stress_connections["default"].transaction_mode == "IMMEDIATE"
+
+
+def test_concurrent_comment_writes_are_not_locked(stress_connections):
+    errors = []
+    barrier = threading.Barrier(WORKERS)
+
+    def post_comments(worker):
+        connection = stress_connections["default"]
+        barrier.wait()
+        try:
+            for i in range(WRITES_PER_WORKER):
+                # Как при создании комментария: чтение, затем запись.
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT comment_count FROM post WHERE id = 1")
+                        cursor.fetchone()
+                        cursor.execute(
+                            "INSERT INTO comment (text) VALUES (%s)",
+                            [f"{worker}-{i}"],
+                        )
+                        cursor.execute(
+                            "UPDATE post SET comment_count = comment_count + 1"
+                            " WHERE id = 1")
+        except OperationalError as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=post_comments, args=(worker,))
+               for worker in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, (
+        f"Параллельная запись завершилась ошибками: {errors[:3]}")
+    with stress_connections["default"].cursor() as cursor:
+        cursor.execute("SELECT comment_count FROM post WHERE id = 1")
+        assert cursor.fetchone()[0] == WORKERS * WRITES_PER_WORKER
+        cursor.execute("SELECT COUNT(*) FROM comment")
+        assert cursor.fetchone()[0] == WORKERS * WRITES_PER_WORKER
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _visible_ids():
+    return set(Post.objects.filter(is_visible=True).values_list(
+        "id", flat=True))
+
+
+def test_is_visible_follows_post_and_category(post_with_published_location):
+    post = post_with_published_location
+    assert post.id in _visible_ids()
+
+    post.is_published = False
+    post.save()
+    assert post.id not in _visible_ids(), (
+        "Убедитесь, что снятый с публикации пост пропадает из лент."
+    )
+    post.is_published = True
+    post.save()
+
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert post.id not in _visible_ids(), (
+        "Убедитесь, что посты снятой с публикации категории пропадают"
+        " из лент."
+    )
+    category.is_published = True
+    category.save()
+    assert post.id in _visible_ids()
+
+    category.delete()
+    assert post.id not in _visible_ids(), (
+        "Убедитесь, что посты удалённой категории пропадают из лент."
+    )
+
+
+def test_publish_due_posts(future_posts, unlogged_client):
+    due = future_posts[0]
+    assert not _visible_ids().intersection(p.id for p in future_posts)
+    Post.objects.filter(pk=due.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    call_command("publish_due_posts", verbosity=0)
+    assert _visible_ids().intersection(p.id for p in future_posts) == {
+        due.id}, (
+        "Убедитесь, что `publish_due_posts` открывает посты, дата"
+        " публикации которых наступила, и не трогает остальные."
+    )